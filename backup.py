@@ -15,6 +15,7 @@ from selenium.common.exceptions import NoSuchElementException, StaleElementRefer
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from gspread_formatting import format_cell_ranges, CellFormat, TextFormat, Color
+from session_cache import restore_session, save_session, drop_session
 
 # ─── 0. 로깅 설정 ──────────────────────────────────────────────────
 logging.basicConfig(
@@ -140,19 +141,35 @@ def fetch_cards_and_parse(page: int, driver):
 
     return parsed_items
 
+def signed_in(driver) -> bool:
+    """헤더 계정 메뉴에 로그인 안내 문구가 없으면 로그인 상태"""
+    try:
+        greeting = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.ID, "nav-link-accountList-nav-line-1"))
+        ).text
+    except TimeoutException:
+        return False
+    return not re.search(r"anmelden|sign in", greeting, re.I)
+
 # ────────────────────────── 3. 크롤링 및 로그인 적용 ──────────────────────────
 driver = get_driver()
 wait = WebDriverWait(driver, 20)
 try:
-    # 1) Amazon 로그인
-    driver.get("https://www.amazon.de/-/en/ap/signin?openid.pape.max_auth_age=0&openid.return_to=https%3A%2F%2Fwww.amazon.de%2Fref%3Dnav_signin&openid.identity=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.assoc_handle=deflex&openid.mode=checkid_setup&openid.claimed_id=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.ns=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0")
-    amz_user = os.environ["AMZ_USER"]
-    amz_pass = os.environ["AMZ_PASS"]
-    wait.until(EC.presence_of_element_located((By.ID, "ap_email"))).send_keys(amz_user)
-    wait.until(EC.element_to_be_clickable((By.ID, "continue"))).click()
-    wait.until(EC.presence_of_element_located((By.ID, "ap_password"))).send_keys(amz_pass)
-    wait.until(EC.element_to_be_clickable((By.ID, "signInSubmit"))).click()
-    logging.info("🔐 로그인 완료 (%s)", amz_user)
+    # 1) Amazon 로그인 (캐시된 로그인 세션이 유효하면 생략)
+    if restore_session(driver, "amazon_de_login", "https://www.amazon.de/") and signed_in(driver):
+        logging.info("🔐 캐시된 로그인 세션 사용")
+    else:
+        drop_session("amazon_de_login")
+        driver.get("https://www.amazon.de/-/en/ap/signin?openid.pape.max_auth_age=0&openid.return_to=https%3A%2F%2Fwww.amazon.de%2Fref%3Dnav_signin&openid.identity=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.assoc_handle=deflex&openid.mode=checkid_setup&openid.claimed_id=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.ns=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0")
+        amz_user = os.environ["AMZ_USER"]
+        amz_pass = os.environ["AMZ_PASS"]
+        wait.until(EC.presence_of_element_located((By.ID, "ap_email"))).send_keys(amz_user)
+        wait.until(EC.element_to_be_clickable((By.ID, "continue"))).click()
+        wait.until(EC.presence_of_element_located((By.ID, "ap_password"))).send_keys(amz_pass)
+        wait.until(EC.element_to_be_clickable((By.ID, "signInSubmit"))).click()
+        logging.info("🔐 로그인 완료 (%s)", amz_user)
+        wait.until(EC.presence_of_element_located((By.ID, "nav-link-accountList")))
+        save_session(driver, "amazon_de_login")
 
     # 2) 계정에 등록된 기본 배송지 적용
     driver.get("https://www.amazon.de/")
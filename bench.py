@@ -0,0 +1,192 @@
+# bench.py
+"""
+오프라인 벤치마크 — 크롬·시트 없이 핫패스 소요 시간 측정
+- parse          : 저장된 베스트셀러 HTML(--html 또는 스냅샷 보관소) 파싱, 없으면 합성 50카드 페이지
+- parse_prices   : 가격 문자열 N개 → float
+- deltas         : 순위·가격 변동 N행
+- latest_pandas  : 이력 N행 sort + groupby("asin").last() (예전 방식)
+- latest_store   : HistoryStore.latest() 로 오늘 ASIN 조회
+- brand_regex    : 제목 N개 브랜드 정규식 필터 (예전 방식)
+- catalog_match  : 같은 N개를 ProductCatalog 캐시 조회로 필터 (추출은 미리 1회)
+결과는 bench_results/<시각>.json 저장, --compare 기준 대비 느려지면 종료코드 1
+
+사용 예) python bench.py --rows 10000,100000,1000000 --compare bench_results/baseline.json
+"""
+
+import os, sys, glob, json, time, argparse, datetime, tempfile
+from collections import deque
+import numpy as np
+import pandas as pd
+
+from page_parser import parse_cards, match_brand
+from pricing import parse_prices, rank_delta, price_delta
+from history_store import HistoryStore, HIST_COLS
+from snapshot_archive import SnapshotArchive, ARCHIVE_DIR
+from product_catalog import ProductCatalog
+
+RESULTS_DIR = "bench_results"
+N_ASINS = 5000
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+# ─── 합성 데이터 ─────────────────────────────────────────────
+def synthetic_page(n_cards: int = 50) -> bytes:
+    """CARDS_XPATH·카드 셀렉터 구조를 그대로 따르는 베스트셀러 페이지"""
+    cards = "".join(
+        f'<li><div><span class="zg-bdg-text">#{i}</span>'
+        f'<a class="a-link-normal" href="/LG-Monitor-{i}/dp/B0{i:08d}?ref=zg">'
+        f'<img alt="LG UltraGear 27GR{i:02d}QE Monitor" src="x.jpg">'
+        f'<div class="_cDEzb_p13n-sc-css-line-clamp-2_EWgCb">LG UltraGear 27GR{i:02d}QE Gaming Monitor</div></a>'
+        f'<span class="a-price"><span class="a-offscreen">{100 + i},99 €</span></span></div></li>'
+        for i in range(1, n_cards + 1)
+    )
+    return (f'<html><body><div class="a-cardui _cDEzb_card_x"><ol>{cards}</ol></div>'
+            f'</body></html>').encode()
+
+
+def synthetic_prices(n: int, rng) -> pd.Series:
+    euros = rng.integers(80, 2500, n)
+    cents = rng.integers(0, 100, n)
+    de = [f"{e // 1000}.{e % 1000:03d},{c:02d} €" if e >= 1000 else f"{e},{c:02d} €"
+          for e, c in zip(euros[: n // 2], cents[: n // 2])]
+    en = [f"€{e:,}.{c:02d}" for e, c in zip(euros[n // 2:], cents[n // 2:])]
+    return pd.Series(de + en)
+
+
+def synthetic_history(n: int, rng) -> pd.DataFrame:
+    asin_ids = rng.integers(0, N_ASINS, n)
+    days = np.sort(rng.integers(0, max(n // 20, 1), n))
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(days, unit="D")
+    return pd.DataFrame({
+        "asin": [f"B0{a:08d}" for a in asin_ids],
+        "title": "LG Monitor",
+        "rank": rng.integers(1, 101, n),
+        "price": synthetic_prices(n, rng).to_numpy(),
+        "url": "",
+        "date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+        "rank_delta": "-",
+        "price_delta": "-",
+    })[HIST_COLS]
+
+
+# ─── 벤치마크 ─────────────────────────────────────────────────
+def load_pages(html_dir: str, archive_dir: str, limit: int = 20):
+    """HTML 디렉터리 → 스냅샷 보관소(최근 limit 개) → 합성 페이지 순으로 벤치 입력 결정"""
+    paths = sorted(glob.glob(os.path.join(html_dir, "*.html")))
+    if paths:
+        return [open(p, "rb").read() for p in paths], html_dir
+    if os.path.exists(os.path.join(archive_dir, "index.jsonl")):
+        archive = SnapshotArchive(archive_dir)
+        digests = deque((e["html"] for e in archive.iter_index()), maxlen=limit)
+        if digests:
+            return [archive.get(d) for d in digests], archive_dir
+    return [synthetic_page()], "synthetic"
+
+
+def bench_parse(html_dir: str, archive_dir: str, repeat: int) -> dict:
+    pages, source = load_pages(html_dir, archive_dir)
+    if source == "synthetic":
+        # 셀렉터·인코딩이 깨지면 경고 로깅 경로만 재게 되므로 먼저 확인
+        cards = parse_cards(pages[0])
+        assert len(cards) == 50 and all(c["price_text"] for c in cards), \
+            f"합성 페이지 파싱 이상: 카드 {len(cards)}개, 가격 {sum(bool(c['price_text']) for c in cards)}개"
+    sec = best_of(lambda: [parse_cards(p) for p in pages], repeat)
+    return {"n": len(pages), "sec": sec, "per_page_ms": sec / len(pages) * 1000, "source": source}
+
+
+def bench_rows(n: int, repeat: int, rng) -> dict:
+    out = {}
+    prices = synthetic_prices(n, rng)
+    out["parse_prices"] = {"n": n, "sec": best_of(lambda: parse_prices(prices), repeat)}
+
+    ranks_prev = pd.Series(rng.integers(1, 101, n)).astype("float64")
+    ranks_prev[rng.random(n) < 0.1] = np.nan
+    ranks_curr = pd.Series(rng.integers(1, 101, n))
+    prices_prev = prices.sample(frac=1, random_state=0).reset_index(drop=True)
+    out["deltas"] = {"n": n, "sec": best_of(
+        lambda: (rank_delta(ranks_prev, ranks_curr), price_delta(prices_prev, prices)), repeat)}
+
+    hist = synthetic_history(n, rng)
+    today = hist["asin"].drop_duplicates().head(20)
+    out["latest_pandas"] = {"n": n, "sec": best_of(
+        lambda: hist.sort_values("date").groupby("asin", as_index=False).last(), repeat)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with HistoryStore(os.path.join(tmp, "bench.db")) as store:
+            t0 = time.perf_counter()
+            store.append(hist)
+            out["store_append"] = {"n": n, "sec": time.perf_counter() - t0}
+            out["latest_store"] = {"n": n, "sec": best_of(lambda: store.latest(today), repeat)}
+
+        titles = hist["asin"].map(lambda a: f"LG UltraGear 27GR{a[-2:]}QE-B 27 Zoll Gaming Monitor")
+        pairs = list(zip(hist["asin"], titles))
+        out["brand_regex"] = {"n": n, "sec": best_of(
+            lambda: [match_brand(t, ("LG",)) for _, t in pairs], repeat)}
+        with ProductCatalog(os.path.join(tmp, "catalog.db")) as catalog:
+            for a, t in dict(pairs).items():
+                catalog.resolve(a, t)
+            out["catalog_match"] = {"n": n, "sec": best_of(
+                lambda: [catalog.match(a, t, ("LG",)) for a, t in pairs], repeat)}
+    return out
+
+
+def compare(results: dict, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path, encoding="utf-8") as f:
+        base = json.load(f)["results"]
+    regressions = []
+    for key, cur in results.items():
+        old = base.get(key)
+        if not old or not old["sec"]:
+            continue
+        ratio = cur["sec"] / old["sec"]
+        flag = "❌" if ratio > tolerance else "✅"
+        print(f"{flag} {key:<28} {old['sec'] * 1000:9.2f} ms → {cur['sec'] * 1000:9.2f} ms  (x{ratio:.2f})")
+        if ratio > tolerance:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--html", default="raw_pages", help="저장된 .html 디렉터리")
+    ap.add_argument("--archive", default=ARCHIVE_DIR, help="스냅샷 보관소 디렉터리")
+    ap.add_argument("--rows", default="10000,100000,1000000",
+                    help="이력 행 수 목록 (쉼표 구분, 예: 10000,10000000)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--compare", help="기준 결과 JSON 경로")
+    ap.add_argument("--tolerance", type=float, default=1.25, help="허용 배율 (기본 1.25)")
+    ap.add_argument("--save", help="결과 저장 경로 (기본 bench_results/<시각>.json)")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(42)
+    results = {"parse": bench_parse(args.html, args.archive, args.repeat)}
+    for n in (int(x) for x in args.rows.split(",") if x):
+        for name, r in bench_rows(n, args.repeat, rng).items():
+            results[f"{name}[{n}]"] = r
+
+    for key, r in results.items():
+        print(f"{key:<28} n={r['n']:<9} {r['sec'] * 1000:10.2f} ms")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = args.save or os.path.join(
+        RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d_%H%M%S") + ".json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"run_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                   "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"💾 {path}")
+
+    if args.compare and os.path.exists(args.compare):
+        if compare(results, args.compare, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
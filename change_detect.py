@@ -0,0 +1,24 @@
+# change_detect.py
+"""
+변경 감지 — 직전 상태(latest) 대비 실제로 달라진 행만 골라냄
+- 신규 ASIN, 순위 변동, 가격 변동(센트 단위 비교), 목록 재진입
+- 모두 벡터 연산 (행 단위 apply 없음)
+"""
+
+import pandas as pd
+from pricing import price_cents
+
+
+def changed_mask(df: pd.DataFrame) -> pd.Series:
+    """rank · rank_prev · price · price_prev · present_prev 열 → 기록이 필요한 행 True"""
+    rank_prev = pd.to_numeric(df["rank_prev"], errors="coerce")
+    rank_curr = pd.to_numeric(df["rank"], errors="coerce")
+    is_new = rank_prev.isna()
+
+    cents_prev = price_cents(df["price_prev"])
+    cents_curr = price_cents(df["price"])
+    both_na = cents_prev.isna() & cents_curr.isna()
+    price_moved = (cents_prev != cents_curr).fillna(True) & ~both_na
+
+    reentered = pd.to_numeric(df["present_prev"], errors="coerce").eq(0)
+    return (is_new | rank_prev.ne(rank_curr) | price_moved | reentered).astype(bool)
@@ -0,0 +1,77 @@
+# checkpoint.py
+"""
+작업별 실행 체크포인트 (로컬 디스크)
+- pages/p<N>.json : 페이지별 파싱 결과(브랜드 레코드) — 수집 직후 저장
+- payload.json    : 기록 직전 페이로드(실행 시각, Today 행, History 추가 행, 이탈 행)
+- 실패한 실행을 다시 돌리면 남은 단계부터 이어서 진행, 정상 완료 시 clear()
+- CHECKPOINT_MAX_AGE 보다 오래된 체크포인트는 버림 (다음 정기 실행에 섞이지 않도록)
+"""
+
+import os, json, time, shutil, logging
+
+CHECKPOINT_DIR     = os.environ.get("CHECKPOINT_DIR", ".checkpoint")
+CHECKPOINT_MAX_AGE = int(os.environ.get("CHECKPOINT_MAX_AGE", str(6 * 3600)))   # 초
+
+
+def _write_json(path: str, obj) -> None:
+    """원자적 쓰기 (중간에 죽어도 깨진 파일이 남지 않음)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, default=lambda o: o.item())   # numpy 스칼라
+    os.replace(tmp, path)
+
+
+def _read_json(path: str):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class Checkpoint:
+    def __init__(self, name: str, root: str = CHECKPOINT_DIR, max_age: int = CHECKPOINT_MAX_AGE):
+        self.name = name
+        self.dir = os.path.join(root, name)
+        meta = _read_json(os.path.join(self.dir, "meta.json"))
+        if meta and time.time() - meta.get("created_at", 0) > max_age:
+            logging.info(f"⌛ [{name}] 오래된 체크포인트 삭제")
+            self.clear()
+            meta = None
+        self.meta = meta or {}
+
+    def _touch(self):
+        if not self.meta:
+            self.meta = {"created_at": time.time()}
+            _write_json(os.path.join(self.dir, "meta.json"), self.meta)
+
+    def run_date(self, default: str) -> str:
+        """체크포인트의 실행 시각 — 처음이면 default 로 고정해 재시도에도 같은 (asin, date) 유지"""
+        if "run_date" not in self.meta:
+            self.meta = {"created_at": time.time(), **self.meta, "run_date": default}
+            _write_json(os.path.join(self.dir, "meta.json"), self.meta)
+        return self.meta["run_date"]
+
+    def _page_path(self, page: int) -> str:
+        return os.path.join(self.dir, "pages", f"p{page}.json")
+
+    def page(self, page: int):
+        """저장된 페이지 레코드 목록, 없으면 None"""
+        return _read_json(self._page_path(page))
+
+    def save_page(self, page: int, records: list) -> None:
+        self._touch()
+        _write_json(self._page_path(page), records)
+
+    def payload(self):
+        """기록 대기 중인 페이로드 dict, 없으면 None"""
+        return _read_json(os.path.join(self.dir, "payload.json"))
+
+    def save_payload(self, payload: dict) -> None:
+        self._touch()
+        _write_json(os.path.join(self.dir, "payload.json"), payload)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.meta = {}
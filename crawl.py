@@ -2,24 +2,38 @@
 """
 Amazon.de 베스트셀러 ▸ Monitors 1~100위
 - LG 모니터 필터, 가격·순위·변동 기록 (스크롤 포함)
+- ★ jobs.json 기반 다중 마켓플레이스·카테고리·브랜드 작업 동시 실행 (마켓플레이스별 드라이버 풀 공유)
 - ★ 계정 기본 주소 기준 배송지 UI 적용 (우편번호 직접 입력)
 - 동적 클래스 대신 DOM 구조·텍스트 기반 안정적 셀렉터 적용
 - ★ 로그인 절차 제거 (쿠키/프로필로 이미 로그인 가정)
+- ★ 페이지·시트 페이로드 체크포인트 → 실패 후 재실행 시 남은 단계부터 이어서 진행
+- ★ asyncio 오케스트레이션: 시트 인증·이력 조회 ∥ 크롬 예열, 페이지 N 파싱 ∥ N+1 로딩, 시트 기록 ∥ 드라이버 종료
 """
 
-import sys, os, re, json, base64, datetime, time, logging
-import pandas as pd, gspread, pytz, numpy as np
+import sys, os, json, base64, datetime, time, logging, queue, atexit, threading, asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import pandas as pd, gspread, pytz, requests
 from google.oauth2.service_account import Credentials
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import (
-    NoSuchElementException,
-    StaleElementReferenceException,
-    TimeoutException,
-)
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from gspread_formatting import format_cell_ranges, CellFormat, TextFormat, Color
+from page_parser import CARDS_XPATH, parse_cards, to_records
+from session_cache import restore_session, save_session, drop_session, load_cookies
+from http_fetch import HttpFetcher
+from history_store import HistoryStore, EXIT_MARK
+from pricing import rank_delta, price_delta
+from change_detect import changed_mask
+from sheet_sink import SheetSink, FakeSpreadsheet, with_backoff
+from metrics import METRICS
+from jobs import load_jobs
+from snapshot_archive import SnapshotArchive, ARCHIVE_DIR
+from dashboard import build_dashboard, DASHBOARD_PATH
+from checkpoint import Checkpoint
+from product_catalog import ProductCatalog
 
 # ─── 0. 로깅 설정 ─────────────────────────────────────────────
 logging.basicConfig(
@@ -30,283 +44,699 @@ logging.basicConfig(
         logging.StreamHandler(sys.stdout),
     ],
 )
-logging.info("🔍 LG 모니터 크롤러 시작")
+logging.info("🔍 베스트셀러 크롤러 시작")
+atexit.register(METRICS.write)   # 정상·조기 종료 모두 실행 요약 기록
 
 # ────────────────────────── 1. Selenium 준비 ─────────────────────────
-def get_driver():
+LEAN_BROWSER = os.environ.get("LEAN_BROWSER", "1") == "1"   # 이미지·폰트·광고 차단 경량 모드
+
+# 텍스트·링크만 읽으므로 불필요한 리소스는 CDP 로 요청 자체를 차단
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*doubleclick.net*", "*amazon-adsystem.com*", "*googlesyndication.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*facebook.net*",
+    "*fls-eu.amazon.*", "*unagi.amazon.*", "*unagi-eu.amazon.*",
+    "*/uedata*", "*/rd/uedata*", "*/batch/1/OE/*",
+]
+
+LEAN_ARGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-gpu",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+    "--mute-audio",
+    "--no-first-run",
+]
+
+def get_driver(lean: bool = LEAN_BROWSER, lang: str = "de-DE"):
     opts = webdriver.ChromeOptions()
     opts.add_argument("--headless=new")
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
     opts.add_argument("--window-size=1280,4000")
-    opts.add_argument("--lang=de-DE")
+    opts.add_argument(f"--lang={lang}")
     opts.add_argument(
         "user-agent=Mozilla/5.0 (X11; Linux x86_64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) "
         "Chrome/126.0 Safari/537.36"
     )
-    return webdriver.Chrome(options=opts)
+    if lean:
+        for arg in LEAN_ARGS:
+            opts.add_argument(arg)
+        opts.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    with METRICS.stage("get_driver"):
+        driver = webdriver.Chrome(options=opts)
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
 
 # ────────────────────────── 2. 상수 정의 ───────────────────────────
-BASE_URL = "https://www.amazon.de/gp/bestsellers/computers/429868031/"
-CARDS_XPATH = "//div[contains(@class,'a-cardui') and contains(@class,'_cDEzb_card')]//ol/li"
+ARCHIVE = SnapshotArchive() if ARCHIVE_DIR else None         # page_source·전체 순위 보관 (오프라인 재파싱용)
+CATALOG = ProductCatalog()      # ASIN → 브랜드·모델 캐시 (브랜드 필터는 제목 정규식 대신 조회)
+CRAWL_WORKERS = int(os.environ.get("CRAWL_WORKERS", "2"))   # 마켓플레이스별 동시에 띄울 Chrome 수
+JOB_WORKERS   = int(os.environ.get("JOB_WORKERS", "4"))     # 동시에 진행할 작업 수
+FETCH_BACKEND = os.environ.get("FETCH_BACKEND", "selenium")  # "selenium" | "http"
+SHEET_DRY_RUN = os.environ.get("SHEET_DRY_RUN") == "1"       # 시트 대신 요청 본문만 파일로 기록
+IO_THREADS    = int(os.environ.get("IO_THREADS", "32"))      # Selenium·gspread·파싱을 넘기는 스레드 수
+
+CARDS_PER_PAGE = 50     # 베스트셀러 페이지당 카드 수
+HTTP_MIN_CARDS = int(os.environ.get("HTTP_MIN_CARDS", str(CARDS_PER_PAGE)))  # 정적 HTML 카드가 이보다 적으면 Selenium 대체
+SCROLL_TIMEOUT = 60     # 페이지당 최대 스크롤 시간(초)
+SCROLL_POLL    = 0.25   # 카드 수·네트워크 상태 확인 간격(초)
+SCROLL_SETTLE  = 2.0    # 카드 수·리소스 요청이 이 시간 동안 그대로면 로딩 완료로 간주
+PAGE_STATS = {}         # "작업:p페이지" → {"backend", "load_sec", "iterations", "cards", "total_sec", "kb"}
+PAGE_STATS_LOCK = threading.Lock()
+
+# 문서 + 리소스 전송량(바이트) 합계 — Timing-Allow-Origin 없는 타 도메인은 0 으로 잡히는 근사치
+PAGE_BYTES_JS = r"""
+return performance.getEntriesByType("navigation")
+  .concat(performance.getEntriesByType("resource"))
+  .reduce((sum, e) => sum + (e.transferSize || 0), 0);
+"""
+
+# 스크롤 + 카드 수 + 마지막 <li> 렌더링 여부 + 리소스 요청 수를 한 번의 왕복으로 확인
+SCROLL_PROBE_JS = r"""
+window.scrollTo(0, document.body.scrollHeight);
+const snap = document.evaluate(arguments[0], document, null,
+                               XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const n = snap.snapshotLength;
+const last = n ? snap.snapshotItem(n - 1) : null;
+const rendered = !!(last && last.querySelector('a[href*="/dp/"]')
+                    && (last.innerText || "").trim());
+return [n, rendered, performance.getEntriesByType("resource").length,
+        document.readyState === "complete"];
+"""
 
 # ────────────────────────── 3. 상품 데이터 수집 함수 ─────────────────
-def fetch_cards_and_parse(page: int, driver):
-    parsed_items = []
-    url = BASE_URL if page == 1 else f"{BASE_URL}?pg={page}"
-    logging.info(f"▶️ 요청 URL (page {page}): {url}")
-    driver.get(url)
+def page_key(job: dict, page: int) -> str:
+    return f"{job['name']}:p{page}"
 
+
+def record_page_stats(job: dict, page: int, **stats):
+    with PAGE_STATS_LOCK:
+        PAGE_STATS.setdefault(page_key(job, page), {}).update(stats)
+        return dict(PAGE_STATS[page_key(job, page)])
+
+
+def scroll_until_stable(driver, job: dict, page: int) -> int:
+    """
+    고정 sleep 대신 실제 신호로 스크롤 종료 판단
+    - 카드가 CARDS_PER_PAGE 개 모이고 마지막 <li> 가 렌더링되면 즉시 종료
+    - 그 전이라도 카드 수·리소스 요청 수가 SCROLL_SETTLE 초간 변화 없으면 종료 (짧은 목록)
+    """
+    start = last_change = time.time()
+    last_state, iterations, count = None, 0, 0
+    while True:
+        iterations += 1
+        METRICS.count("scroll_iterations")
+        count, rendered, resources, complete = driver.execute_script(SCROLL_PROBE_JS, CARDS_XPATH)
+        now = time.time()
+        if (count, resources) != last_state:
+            last_state, last_change = (count, resources), now
+        if count >= CARDS_PER_PAGE and rendered:
+            break
+        if rendered and complete and now - last_change >= SCROLL_SETTLE:
+            break
+        if now - start >= SCROLL_TIMEOUT:
+            logging.warning(f"⚠️ {page_key(job, page)}: 스크롤 타임아웃 ({count}개)")
+            break
+        time.sleep(SCROLL_POLL)
+
+    stats = record_page_stats(job, page, load_sec=round(time.time() - start, 2),
+                              iterations=iterations, cards=count)
+    logging.info(f"⏱️ {page_key(job, page)} 로딩: {stats}")
+    return count
+
+def page_url(job: dict, page: int) -> str:
+    return job["base_url"] if page == 1 else f"{job['base_url']}?pg={page}"
+
+
+def archive_page(html: str, job: dict, page: int, cards: list):
+    """원본 HTML·전체 순위 압축 보관 (ARCHIVE_DIR 설정 시)"""
+    if ARCHIVE:
+        taken_at = datetime.datetime.now(pytz.timezone("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+        with METRICS.stage("archive"):
+            ARCHIVE.add(taken_at, job["name"], page, html, cards)
+
+
+def parse_and_log(html: str, job: dict, page: int, archive: bool = True) -> list:
+    """로컬(lxml) 파싱 → CARD_DATA 로그 → (archive 면) 원본 HTML·전체 순위 압축 보관 → 카드 목록"""
+    with METRICS.stage("parse"):
+        cards = parse_cards(html, job["site"], job["brands"], job["symbol"], catalog=CATALOG)
+    METRICS.count("cards_parsed", len(cards))
+    logging.info(f"✅ {page_key(job, page)} 카드 수집 완료: {len(cards)}개")
+
+    for info in cards:
+        logging.info(f"CARD_DATA {json.dumps({'job': job['name'], **info}, ensure_ascii=False)}")
+
+    if archive:
+        archive_page(html, job, page, cards)
+    return cards
+
+
+def load_page(page: int, driver, job: dict):
+    """Selenium 으로 로딩·스크롤 → page_source, 카드 로딩 실패 시 None (파싱은 호출 측에서 별도로)"""
+    url = page_url(job, page)
+    logging.info(f"▶️ 요청 URL ({page_key(job, page)}): {url}")
+    page_start = time.time()
     try:
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.XPATH, CARDS_XPATH))
-        )
+        with METRICS.stage("page_load"):
+            driver.get(url)
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.XPATH, CARDS_XPATH))
+            )
     except TimeoutException:
-        logging.error(f"⛔ page {page}: 카드 없음 — 타임아웃")
-        return []
+        logging.error(f"⛔ {page_key(job, page)}: 카드 없음 — 타임아웃")
+        METRICS.count("page_timeouts")
+        return None
+
+    with METRICS.stage("scroll"):
+        scroll_until_stable(driver, job, page)
+    stats = record_page_stats(
+        job, page,
+        backend="selenium",
+        total_sec=round(time.time() - page_start, 2),
+        kb=round(driver.execute_script(PAGE_BYTES_JS) / 1024),
+    )
+    logging.info(f"📶 {page_key(job, page)} 전송량: {stats['kb']} KB")
 
-    start, last_count = time.time(), 0
-    while True:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(5)
-        cards = driver.find_elements(By.XPATH, CARDS_XPATH)
-        curr = len(cards)
-        if (page == 1 and curr < 50 and time.time() - start < 60) or (
-            curr != last_count and time.time() - start < 60
-        ):
-            last_count = curr
-            continue
-        break
-
-    logging.info(f"✅ page {page} 카드 수집 완료: {len(cards)}개")
-
-    for idx, card in enumerate(cards, start=1):
-        try:
-            rank_el = card.find_element(By.XPATH, './/span[contains(text(), "#")]')
-            rank = int(re.sub(r"\D", "", rank_el.text.strip()))
-        except Exception:
-            logging.warning(f"[{idx}] 랭크 추출 실패 → 건너뜀")
-            continue
+    # page_source 한 번만 받고 드라이버는 바로 다음 페이지로 (파싱은 로컬에서)
+    return driver.page_source
 
-        try:
-            title = card.find_element(
-                By.XPATH,
-                './/div[contains(@class,"_cDEzb_p13n-sc-css-line-clamp-2_EWgCb")]'
-            ).text.strip()
-        except NoSuchElementException:
-            try:
-                title = card.find_element(By.XPATH, './/img[@alt]').get_attribute("alt").strip()
-            except Exception:
-                title = ""
-        title = title.replace("\u00a0", " ").replace("\u202f", " ")
-        lg_match = bool(re.search(r"\bLG\b", title, re.I))
 
-        try:
-            price_raw = ""
-            selectors = [
-                ('xpath', './/span[@class="a-offscreen"]'),
-                ('css',   'span.a-price > span.a-offscreen'),
-                ('xpath', './/*[contains(@class, "price")]'),
-                ('css',   'span.p13n-sc-price'),
-            ]
-            for method, sel in selectors:
-                try:
-                    txt = (card.find_element(By.XPATH, sel).text
-                           if method=='xpath'
-                           else card.find_element(By.CSS_SELECTOR, sel).text).strip()
-                    if '€' in txt:
-                        price_raw = txt
-                        break
-                except NoSuchElementException:
-                    continue
-            if not price_raw:
-                raise NoSuchElementException("유효한 가격 요소 없음")
-        except Exception:
-            logging.warning(f"[{idx}] 가격 추출 실패 → 빈 문자열로 대체")
-            price_raw = ""
+def parse_page(html: str, job: dict, page: int, ckpt: Checkpoint) -> list:
+    """HTML → 브랜드 레코드 + 페이지 체크포인트"""
+    records = to_records(parse_and_log(html, job, page))
+    ckpt.save_page(page, records)
+    return records
 
-        try:
-            link_el = card.find_element(By.XPATH, './/a[contains(@href,"/dp/")]')
-            href = link_el.get_attribute("href").split("?",1)[0]
-            asin = re.search(r"/dp/([A-Z0-9]{10})", href).group(1)
-        except Exception:
-            logging.warning(f"[{idx}] 링크/ASIN 추출 실패 → 건너뜀")
-            continue
-
-        info = {
-            "rank": rank,
-            "title": title,
-            "price_text": price_raw,
-            "asin": asin,
-            "url": href,
-            "lg_match": lg_match
-        }
-        logging.info(f"CARD_DATA {json.dumps(info, ensure_ascii=False)}")
-
-        if lg_match:
-            parsed_items.append({
-                "asin": asin,
-                "title": title,
-                "url": href,
-                "price": price_raw,
-                "rank": rank
-            })
-
-    return parsed_items
-
-# ────────────────────────── 가격 파싱 함수 추가 ──────────────────────
-def price_to_float(txt: str):
-    if not txt or pd.isna(txt):
-        return np.nan
-    txt = re.sub(r"[^\d,.,,]", "", txt)
-    if txt.count(",") == 1 and txt.count(".") >= 1:
-        txt = txt.replace(".", "").replace(",", ".")
-    elif txt.count(",") == 1 and txt.count(".") == 0:
-        txt = txt.replace(",", ".")
-    try:
-        return float(txt)
-    except:
-        return np.nan
-
-# ────────────────────────── 4. 메인 실행 ───────────────────────────
-driver = get_driver()
-wait = WebDriverWait(driver, 20)
-
-# (A) 배송지 UI 설정
-logging.info("📍 배송지 설정 시작")
-driver.get(BASE_URL)
-time.sleep(2)
-driver.add_cookie({"name": "lc-main",    "value": "de_DE"})
-driver.add_cookie({"name": "i18n-prefs", "value": "EUR"})
-driver.refresh()
-time.sleep(5)
 
+def fetch_page_http(fetcher: HttpFetcher, job: dict, page: int):
+    """정적 HTML 로 수집 → 브랜드 레코드, 카드가 HTTP_MIN_CARDS 미만이면 None (Selenium 대체 필요)"""
+    url = page_url(job, page)
+    logging.info(f"▶️ HTTP 요청 ({page_key(job, page)}): {url}")
+    page_start = time.time()
+    try:
+        with METRICS.stage("http_fetch"):
+            html = fetcher.fetch(url)
+    except requests.RequestException as e:
+        logging.warning(f"⚠️ {page_key(job, page)}: HTTP 수집 실패 ({e})")
+        METRICS.count("http_fallbacks")
+        return None
+    cards = parse_and_log(html, job, page, archive=False)   # 대체되는 일부 페이지는 보관하지 않음
+    record_page_stats(job, page, backend="http", cards=len(cards),
+                      total_sec=round(time.time() - page_start, 2),
+                      kb=round(len(html.encode("utf-8")) / 1024))
+    if len(cards) < HTTP_MIN_CARDS:
+        logging.warning(f"⚠️ {page_key(job, page)}: 정적 HTML 카드 {len(cards)}개 → Selenium 으로 대체")
+        METRICS.count("http_fallbacks")
+        return None
+    archive_page(html, job, page, cards)
+    return to_records(cards)
+
+# ────────────────────────── 배송지 설정 · 드라이버 풀 ──────────────────
 MAX_ATTEMPTS = 5
 RETRY_DELAY  = 5
 
-for attempt in range(1, MAX_ATTEMPTS + 1):
+def setup_location(driver, job: dict) -> bool:
+    """통화·언어 쿠키 + 우편번호 배송지 적용 → 성공 여부"""
+    wait = WebDriverWait(driver, 20)
+    logging.info(f"📍 배송지 설정 시작 ({job['marketplace']} · {job['zip']})")
+    driver.get(job["base_url"])
+    time.sleep(2)
+    driver.add_cookie({"name": "lc-main",    "value": job["locale"]})
+    driver.add_cookie({"name": "i18n-prefs", "value": job["currency"]})
+    driver.refresh()
+    time.sleep(5)
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            logging.info(f"🔍 배송지 버튼 찾기 시도 {attempt}/{MAX_ATTEMPTS}")
+            deliver_to_btn = wait.until(EC.presence_of_element_located(
+                (By.XPATH, '//a[contains(@id, "nav-global-location")]')
+            ))
+            driver.execute_script("arguments[0].click();", deliver_to_btn)
+            logging.info("📍 배송지 버튼 클릭 성공")
+            break
+        except TimeoutException:
+            logging.warning(f"⚠️ 배송지 버튼 실패 — 새로고침 후 재시도")
+            METRICS.count("location_retries")
+            driver.refresh()
+            time.sleep(RETRY_DELAY)
+    else:
+        logging.error(f"❌ 배송지 버튼 실패")
+        return False
+
     try:
-        logging.info(f"🔍 배송지 버튼 찾기 시도 {attempt}/{MAX_ATTEMPTS}")
-        deliver_to_btn = wait.until(EC.presence_of_element_located(
-            (By.XPATH, '//a[contains(@id, "nav-global-location")]')
-        ))
-        driver.execute_script("arguments[0].click();", deliver_to_btn)
-        logging.info("📍 배송지 버튼 클릭 성공")
-        break
-    except TimeoutException:
-        logging.warning(f"⚠️ 배송지 버튼 실패 — 새로고침 후 재시도")
+        zip_in = wait.until(EC.presence_of_element_located((By.ID, "GLUXZipUpdateInput")))
+        zip_in.clear()
+        zip_in.send_keys(job["zip"])
+        wait.until(EC.element_to_be_clickable((By.ID, "GLUXZipUpdate"))).click()
+        logging.info("📦 우편번호 적용 완료")
+        time.sleep(3)
         driver.refresh()
-        time.sleep(RETRY_DELAY)
-else:
-    logging.error(f"❌ 배송지 버튼 실패 → 종료")
-    driver.quit()
-    sys.exit(1)
+        time.sleep(2)
+    except Exception as e:
+        logging.error(f"❌ 우편번호 설정 실패: {e}")
+        return False
 
-try:
-    zip_in = wait.until(EC.presence_of_element_located((By.ID, "GLUXZipUpdateInput")))
-    zip_in.clear()
-    zip_in.send_keys("65760")
-    wait.until(EC.element_to_be_clickable((By.ID, "GLUXZipUpdate"))).click()
-    logging.info("📦 우편번호 적용 완료")
-    time.sleep(3)
-    driver.refresh()
-    time.sleep(2)
-except Exception as e:
-    logging.error(f"❌ 우편번호 설정 실패: {e}")
-    driver.quit()
-    sys.exit(1)
+    try:
+        ship_to = wait.until(EC.presence_of_element_located((By.ID, "glow-ingress-line2"))).text
+        logging.info(f"✅ 현재 배송지: {ship_to}")
+    except Exception:
+        logging.error("❌ 배송지 확인 실패")
+        return False
+    return True
 
-try:
-    ship_to = wait.until(EC.presence_of_element_located((By.ID, "glow-ingress-line2"))).text
-    logging.info(f"✅ 현재 배송지: {ship_to}")
-except Exception:
-    logging.error("❌ 배송지 확인 실패")
-    driver.quit()
-    sys.exit(1)
 
-# (B) 크롤링
-logging.info("🔍 크롤링 시작")
-items = []
-for pg in (1, 2):
+def location_ok(driver, job: dict, timeout: int = 10) -> bool:
+    """헤더의 배송지(glow-ingress-line2)에 우편번호가 보이면 세션 유효"""
     try:
-        items += fetch_cards_and_parse(pg, driver)
+        ship_to = WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.ID, "glow-ingress-line2"))
+        ).text
     except TimeoutException:
-        logging.error(f"⛔ page {pg}: 카드 로딩 실패")
-driver.quit()
-
-# ────────────────────────── 5. 시트 기록 ───────────────────────────
-cols = ["asin","title","rank","price","url","date","rank_delta","price_delta"]
-df = pd.DataFrame(items)
-if df.empty:
-    logging.info("LG 모니터 없음 → 업데이트 생략")
-    sys.exit(0)
-
-df = df.sort_values("rank").reset_index(drop=True)
-kst = pytz.timezone("Asia/Seoul")
-df["date"] = datetime.datetime.now(kst).strftime("%Y-%m-%d %H:%M:%S")
-
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-creds = Credentials.from_service_account_info(
-    json.loads(base64.b64decode(os.environ["GCP_SA_BASE64"]).decode()),
-    scopes=SCOPES
-)
-gc = gspread.authorize(creds)
-sh = gc.open_by_key(os.environ["SHEET_ID"])
+        return False
+    return job["zip"] in ship_to
 
-ws_hist = sh.worksheet("History") if "History" in [w.title for w in sh.worksheets()] else sh.add_worksheet("History", 2000, 20)
-ws_today = sh.worksheet("Today") if "Today" in [w.title for w in sh.worksheets()] else sh.add_worksheet("Today", 100, 20)
 
-try:
-    prev = pd.DataFrame(ws_hist.get_all_records()).dropna()
-except:
-    prev = pd.DataFrame()
+def warm_driver(job: dict):
+    """배송지까지 적용된 드라이버, 실패 시 None (캐시된 세션이 유효하면 설정 생략)"""
+    driver = get_driver(lang=job["lang"])
+    try:
+        with METRICS.stage("session_restore"):
+            cached = (restore_session(driver, job["session"], job["base_url"])
+                      and location_ok(driver, job))
+        if cached:
+            logging.info("✅ 캐시된 세션 사용 — 배송지 설정 생략")
+            METRICS.count("session_cache_hits")
+            return driver
+        drop_session(job["session"])
+        with METRICS.stage("location_setup"):
+            ok = setup_location(driver, job)
+        if ok:
+            save_session(driver, job["session"])
+            return driver
+        METRICS.count("location_failures")
+    except Exception as e:
+        logging.error(f"❌ 드라이버 준비 실패: {e}")
+    driver.quit()
+    return None
+
+
+class DriverPool:
+    """
+    배송지 설정을 마친 Chrome 드라이버 N개 — 페이지 작업마다 대여 후 반납
+    - 캐시된 세션이 없으면 첫 드라이버만 배송지 설정·세션 저장, 나머지는 그 세션을 복원해 병렬 예열
+    """
+
+    def __init__(self, size: int, job: dict):
+        warmed = [] if load_cookies(job["session"]) else [warm_driver(job)]
+        with ThreadPoolExecutor(max_workers=size) as ex:
+            warmed += ex.map(lambda _: warm_driver(job), range(size - len(warmed)))
+        self.drivers = [d for d in warmed if d is not None]
+        self._idle = queue.Queue()
+        for d in self.drivers:
+            self._idle.put(d)
+        logging.info(f"🚗 드라이버 풀 준비 ({job['session']}): {len(self.drivers)}/{size}")
+
+    @contextmanager
+    def lease(self):
+        driver = self._idle.get()
+        try:
+            yield driver
+        finally:
+            self._idle.put(driver)
 
-if not prev.empty and {"asin","rank","price","date"} <= set(prev.columns):
-    last = prev.sort_values("date").groupby("asin", as_index=False).last()[["asin","rank","price"]]
-    last.columns = ["asin","rank_prev","price_prev"]
+    def close(self):
+        for d in self.drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PoolRegistry:
+    """
+    마켓플레이스·우편번호(세션)별 DriverPool 을 처음 필요할 때 한 번만 생성해 작업 간 공유
+    - 세션별 남은 작업 수를 세어 마지막 작업의 수집이 끝나면 그 세션의 풀만 바로 종료
+    """
+
+    def __init__(self, size: int, jobs: list):
+        self.size = size
+        self._pools, self._locks = {}, {}
+        self._pending = Counter(j["session"] for j in jobs)
+        self._lock = threading.Lock()
+
+    def get(self, job: dict) -> DriverPool:
+        key = job["session"]
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._pools:
+                self._pools[key] = DriverPool(self.size, job)
+            return self._pools[key]
+
+    def release(self, job: dict):
+        """작업 1건 수집 종료 — 세션의 남은 작업이 없으면 풀 종료"""
+        key = job["session"]
+        with self._lock:
+            self._pending[key] -= 1
+            if self._pending[key] > 0:
+                return
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock, self._lock:
+            pool = self._pools.pop(key, None)
+        if pool is not None:
+            pool.close()
+            logging.info(f"🚗 드라이버 종료 ({key})")
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def crawl_pages(pool: DriverPool, job: dict, pages, ckpt: Checkpoint) -> list:
+    """
+    로딩 → 제한 큐 → 파싱 2단계 파이프라인
+    - 로딩은 드라이버 수만큼 동시에, page_source 를 넘기면 드라이버는 바로 다음 페이지로
+    - 파싱은 큐에서 꺼내 별도 스레드에서 → 페이지 N 파싱 중 N+1 로딩
+    - 한 페이지라도 로딩에 실패하면 작업 전체를 실패로 (빠진 페이지의 제품을 이탈로 기록하지 않도록,
+      파싱을 마친 페이지는 체크포인트에 남아 재실행 시 나머지만 수집)
+    """
+    html_q = asyncio.Queue(maxsize=len(pool.drivers))
+    items = []
+
+    def load(pg):
+        with pool.lease() as driver:
+            try:
+                html = load_page(pg, driver, job)
+            except TimeoutException:
+                html = None
+        if html is None:
+            raise RuntimeError(f"{page_key(job, pg)}: 카드 로딩 실패")
+        return html
+
+    async def produce(pg):
+        html = await asyncio.to_thread(load, pg)
+        await html_q.put((pg, html))
+
+    async def producer():
+        async with asyncio.TaskGroup() as tg:
+            for pg in pages:
+                tg.create_task(produce(pg))
+        await html_q.put(None)
+
+    async def consumer():
+        while (item := await html_q.get()) is not None:
+            pg, html = item
+            items.extend(await asyncio.to_thread(parse_page, html, job, pg, ckpt))
+
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(producer())
+        tg.create_task(consumer())
+    return items
+
+
+def merge_by_rank(items) -> list:
+    """순위순 정렬 + ASIN 중복 제거 (앞 순위 우선)"""
+    merged = {}
+    for item in sorted(items, key=lambda i: i["rank"]):
+        merged.setdefault(item["asin"], item)
+    return list(merged.values())
+
+
+async def crawl_job(job: dict, pools: PoolRegistry, ckpt: Checkpoint) -> list:
+    """작업 1건의 모든 페이지 수집 → 순위순 브랜드 레코드 (체크포인트에 있는 페이지는 생략)"""
+    items, pending = [], []
+    for pg in job["pages"]:
+        saved = ckpt.page(pg)
+        if saved is None:
+            pending.append(pg)
+        else:
+            items += saved
+    if len(pending) < len(job["pages"]):
+        logging.info(f"♻️ [{job['name']}] 체크포인트 페이지 재사용 — 남은 페이지 {pending}")
+        METRICS.count("checkpoint_pages", len(job["pages"]) - len(pending))
+    if not pending:
+        return merge_by_rank(items)
+
+    # (A) HTTP 백엔드: 정적 HTML 로 먼저 시도, 카드가 부족한 페이지만 Selenium 으로 넘김
+    if FETCH_BACKEND == "http":
+        with HttpFetcher(cookies=load_cookies(job["session"]),
+                         locale_cookies={"lc-main": job["locale"], "i18n-prefs": job["currency"]},
+                         accept_language=f"{job['lang']},{job['lang'][:2]};q=0.9") as fetcher:
+            for pg in list(pending):
+                records = await asyncio.to_thread(fetch_page_http, fetcher, job, pg)
+                if records is not None:
+                    ckpt.save_page(pg, records)
+                    items += records
+                    pending.remove(pg)
+
+    # (B) Selenium: 마켓플레이스 드라이버 풀(배송지 설정 완료)을 빌려 병렬 수집
+    if pending:
+        pool = await asyncio.to_thread(pools.get, job)
+        if not pool.drivers:
+            raise RuntimeError(f"배송지 설정된 드라이버 없음 ({job['session']})")
+        items += await crawl_pages(pool, job, pending, ckpt)
+
+    return merge_by_rank(items)
+
+# ────────────────────────── 4. 시트 기록 함수 ──────────────────────────
+OUT_COLS = ["asin","title","rank","price","url","date","rank_delta","price_delta"]
+SHEET_LOCK = threading.Lock()   # 작업별 batchUpdate 는 하나씩 (쓰기 할당량 분산)
+
+
+def open_spreadsheet():
+    if SHEET_DRY_RUN:
+        return FakeSpreadsheet()
+    SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+    creds = Credentials.from_service_account_info(
+        json.loads(base64.b64decode(os.environ["GCP_SA_BASE64"]).decode()),
+        scopes=SCOPES
+    )
+    gc = gspread.authorize(creds)
+    return with_backoff(gc.open_by_key, os.environ["SHEET_ID"])
+
+
+def prepare_history(job: dict, sink: SheetSink) -> pd.DataFrame:
+    """작업별 로컬 이력 저장소 준비 → 직전 값 [asin, rank_prev, price_prev, present_prev] (크롤링과 동시 실행)"""
+    os.makedirs(os.path.dirname(job["history_db"]) or ".", exist_ok=True)
+    with HistoryStore(job["history_db"]) as store:
+        if store.is_empty():
+            # 최초 1회(캐시 없음): 시트 History 전체로 로컬 저장소 초기화
+            try:
+                prev = pd.DataFrame(sink.history_records()).replace("", None)
+            except:
+                prev = pd.DataFrame()
+            if not prev.empty and {"asin","rank","price","date"} <= set(prev.columns):
+                # 값이 모두 있는 행 + 이탈 행(rank 빈 값) — 이탈 행이 있어야 present 가 맞게 복원됨
+                exited = prev["price_delta"].eq(EXIT_MARK) if "price_delta" in prev else False
+                prev = prev[prev.notna().all(axis=1) | (exited & prev[["asin","date"]].notna().all(axis=1))]
+                logging.info("🗄️ [%s] 로컬 이력 초기화: 시트 %s %d행",
+                             job["name"], job["history_sheet"], store.append(prev))
+
+        with METRICS.stage("history_read"):
+            last = store.latest()[["asin","rank","price","present"]]
+    last.columns = ["asin","rank_prev","price_prev","present_prev"]
+    return last
+
+
+def build_payload(job: dict, items: list, run_date: str, last: pd.DataFrame):
+    """변동 계산 → 기록 페이로드 (Today 행, History 추가 행, 이탈 행), 대상 제품 없으면 None"""
+    df = pd.DataFrame(items)
+    if df.empty:
+        logging.info(f"[{job['name']}] 대상 브랜드 제품 없음 → 업데이트 생략")
+        return None
+
+    df = df.sort_values("rank").reset_index(drop=True)
+    df["date"] = run_date
     df = df.merge(last, on="asin", how="left")
-else:
-    df["rank_prev"] = None
-    df["price_prev"] = None
-
-df["price_curr_val"] = df["price"].apply(price_to_float)
-df["price_prev_val"] = df["price_prev"].apply(price_to_float)
-
-def calc_price_delta(row):
-    cur, prev = row["price_curr_val"], row["price_prev_val"]
-    if pd.isna(prev) or pd.isna(cur) or cur == prev:
-        return "-"
-    sign = "▴" if cur > prev else "▾"
-    return f"{sign}{abs(cur - prev):.2f}"
-
-df["rank_delta"] = df["rank_prev"].combine(
-    df["rank"],
-    lambda prev, curr: "-" if pd.isna(prev) or int(prev) == int(curr)
-                       else f"{'▴' if prev > curr else '▾'}{abs(int(prev - curr))}"
-)
-df["price_delta"] = df.apply(calc_price_delta, axis=1)
-
-out_cols = ["asin","title","rank","price","url","date","rank_delta","price_delta"]
-df_out   = df[out_cols].fillna("")
-
-if not ws_hist.get_all_values():
-    ws_hist.append_row(out_cols, value_input_option="USER_ENTERED")
-ws_hist.append_rows(df_out.values.tolist(), value_input_option="USER_ENTERED")
-ws_today.clear()
-ws_today.update([out_cols] + df_out.values.tolist(), value_input_option="USER_ENTERED")
-
-RED, GREEN = Color(1,0,0), Color(0,1,0)
-fmt_ranges = []
-for i, row in df_out.iterrows():
-    r = i + 2
-    for col, letter in [("rank_delta","G"),("price_delta","H")]:
-        v = row[col]
-        if v.startswith("▴"):
-            fmt_ranges.append((f"{letter}{r}", CellFormat(textFormat=TextFormat(bold=True, foregroundColor=GREEN))))
-        elif v.startswith("▾"):
-            fmt_ranges.append((f"{letter}{r}", CellFormat(textFormat=TextFormat(bold=True, foregroundColor=RED))))
-if fmt_ranges:
-    format_cell_ranges(ws_today, fmt_ranges)
-
-logging.info("✅ Google Sheet 업데이트 완료 — LG 모니터 %d개", len(df_out))
+
+    df["rank_delta"]  = rank_delta(df["rank_prev"], df["rank"])
+    df["price_delta"] = price_delta(df["price_prev"], df["price"])
+    df_out = df[OUT_COLS].fillna("")
+
+    # 변경분(신규·변동·재진입)만 이력에 기록, 키프레임 주기엔 전체 기록
+    with HistoryStore(job["history_db"]) as store:
+        keyframe = store.keyframe_due(run_date)
+        exits = store.exits(df["asin"], run_date)
+    changed = changed_mask(df)
+    emit = df_out if keyframe else df_out[changed.to_numpy()]
+    METRICS.count("history_rows_changed", int(changed.sum()))
+    METRICS.count("history_rows_exited", len(exits))
+    logging.info("🔎 [%s] 변경 %d · 이탈 %d / 전체 %d%s", job["name"], int(changed.sum()),
+                 len(exits), len(df_out), " (키프레임)" if keyframe else "")
+
+    return {
+        "run_date": run_date,
+        "keyframe": keyframe,
+        "today":    df_out.values.tolist(),
+        "history":  emit.values.tolist(),
+        "exits":    exits.values.tolist(),
+    }
+
+
+def publish_payload(job: dict, payload: dict, sink: SheetSink, resumed: bool = False) -> int:
+    """
+    페이로드 → 로컬 이력 저장소 + 시트 기록 → History 추가 행 수
+    - 저장소는 (asin, date) 덮어쓰기라 다시 실행해도 안전
+    - 시트 History 에도 이탈 행(rank 빈 값, price_delta "exit")까지 기록 → 시트만으로 시계열 복원 가능
+    - 체크포인트에서 이어 받은 경우 시트 History 에 이미 있는 (asin, date) 행은 제외
+    """
+    hist = pd.DataFrame(payload["history"] + payload["exits"], columns=OUT_COLS)
+    with HistoryStore(job["history_db"]) as store, METRICS.stage("history_write"):
+        store.append(hist, run_date=payload["run_date"], keyframe=payload["keyframe"])
+
+    if not payload["history"] and not payload["exits"]:
+        logging.info(f"[{job['name']}] 순위·가격 변동 없음 → 시트 기록 생략")
+        return 0
+
+    rows = payload["history"] + payload["exits"]
+    if resumed:
+        sent = sink.history_keys()
+        total = len(rows)
+        rows = [r for r in rows if (r[0], r[5]) not in sent]
+        logging.info(f"♻️ [{job['name']}] 미전송 History 행 {len(rows)}/{total}")
+
+    with SHEET_LOCK:
+        sink.write(OUT_COLS, payload["today"], history_rows=rows)
+    logging.info("✅ [%s] Google Sheet 업데이트 완료 — Today %d개, History +%d행",
+                 job["name"], len(payload["today"]), len(rows))
+    return len(rows)
+
+
+async def open_sink(job: dict, sheet_task: asyncio.Task, resumed: bool):
+    """시트 인증(공유) → 탭 메타데이터 → 이력 준비 → (SheetSink, 직전 값 | None)"""
+    sh = await sheet_task
+    sink = await asyncio.to_thread(SheetSink, sh, job["history_sheet"], job["today_sheet"])
+    last = None if resumed else await asyncio.to_thread(prepare_history, job, sink)
+    return sink, last
+
+
+async def run_job(job: dict, pools: PoolRegistry, sheet_task: asyncio.Task) -> dict:
+    """
+    수집 → 페이로드 → 기록, 실패 시 체크포인트를 남겨 다음 실행이 남은 단계부터 재개
+    - 시트 준비·이력 조회는 수집과 동시에, 수집이 끝나면(또는 재개로 수집이 없으면) 풀 반납
+    """
+    started = time.time()
+    ckpt = Checkpoint(job["name"])
+    sink_task = None
+    released = False
+
+    async def release():
+        nonlocal released
+        if not released:
+            released = True
+            await asyncio.to_thread(pools.release, job)
+
+    try:
+        kst = pytz.timezone("Asia/Seoul")
+        run_date = ckpt.run_date(datetime.datetime.now(kst).strftime("%Y-%m-%d %H:%M:%S"))
+        payload = ckpt.payload()
+        resumed = payload is not None
+        sink_task = asyncio.create_task(open_sink(job, sheet_task, resumed))
+        if resumed:
+            logging.info(f"♻️ [{job['name']}] 체크포인트 페이로드로 기록 재개 ({run_date})")
+            METRICS.count("checkpoint_resumes")
+            await release()
+        else:
+            try:
+                items = await crawl_job(job, pools, ckpt)
+            finally:
+                await release()
+        sink, last = await sink_task
+        if not resumed:
+            payload = await asyncio.to_thread(build_payload, job, items, run_date, last)
+            if payload is not None:
+                ckpt.save_payload(payload)
+        rows = 0
+        if payload is not None:
+            rows = await asyncio.to_thread(publish_payload, job, payload, sink, resumed)
+        ckpt.clear()
+        status = "ok"
+    except Exception as e:
+        logging.exception(f"❌ [{job['name']}] 작업 실패 (체크포인트 보존): {e}")
+        rows, status = 0, "error"
+        if sink_task and not sink_task.done():
+            sink_task.cancel()
+        elif sink_task and not sink_task.cancelled():
+            sink_task.exception()   # 수집 실패로 기다리지 않은 시트 준비 오류는 여기서 소비
+    finally:
+        await release()
+    return {"job": job["name"], "status": status, "rows": rows,
+            "sec": round(time.time() - started, 2)}
+
+
+async def main(jobs: list) -> list:
+    """
+    작업 전체 오케스트레이션
+    - 시트 인증은 첫 크롬 예열과 동시에 시작해 모든 작업이 공유
+    - 작업은 JOB_WORKERS 개까지 동시에, 차단 호출(Selenium·gspread·SQLite·파싱)은 스레드로
+    - 세션별 마지막 작업의 수집이 끝나면 남은 시트 기록과 동시에 그 세션의 드라이버 종료
+    """
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=IO_THREADS))
+    sheet_task = asyncio.create_task(asyncio.to_thread(open_spreadsheet))
+    slots = asyncio.Semaphore(JOB_WORKERS)
+    pools = PoolRegistry(CRAWL_WORKERS, jobs)
+
+    async def limited(job):
+        async with slots:
+            return await run_job(job, pools, sheet_task)
+
+    try:
+        results = await asyncio.gather(*(limited(j) for j in jobs))
+    finally:
+        pools.close()
+        if not sheet_task.done():
+            sheet_task.cancel()
+    return results
+
+# ────────────────────────── 5. 메인 실행 ───────────────────────────
+JOBS = load_jobs()
+logging.info(f"🔍 크롤링 시작 — 작업 {len(JOBS)}개 (동시 {JOB_WORKERS})")
+
+results = asyncio.run(main(JOBS))
+METRICS.count("catalog_hits", CATALOG.hits)
+METRICS.count("catalog_misses", CATALOG.misses)
+
+# 정적 대시보드(index.html 용) — 실패해도 크롤링 결과에는 영향 없음
+try:
+    with METRICS.stage("dashboard"):
+        build_dashboard(JOBS, catalog=CATALOG)
+    logging.info(f"📊 대시보드 데이터 갱신 → {DASHBOARD_PATH}")
+except Exception as e:
+    logging.exception(f"⚠️ 대시보드 생성 실패: {e}")
+CATALOG.close()
+
+METRICS.set("pages", PAGE_STATS)
+METRICS.set("jobs", results)
+for r in results:
+    logging.info(f"📋 {r}")
+if any(r["status"] != "ok" for r in results):
+    sys.exit(1)
@@ -0,0 +1,110 @@
+# dashboard.py
+"""
+정적 대시보드 데이터 빌드
+- 실행 후 작업별 로컬 이력 저장소에서 최신 목록 + ASIN 별 순위·가격 시계열을 뽑아 dashboard.json 1개로 기록
+- 시계열은 하루 1점(그날 마지막 실행), DASHBOARD_DAYS 일 · 최대 MAX_POINTS 점으로 다운샘플
+- 제품 카탈로그로 ASIN 별 모델 코드 + 모델별 집계(최고 순위·최저가)를 함께 기록
+- index.html 은 이 파일만 불러옴 (Sheets API · API 키 불필요)
+
+사용 예) python dashboard.py   # jobs.json 기준으로 dashboard.json 재생성
+"""
+
+import os, json, datetime
+import pandas as pd
+
+from history_store import HistoryStore
+from pricing import parse_prices, rank_delta, price_delta
+from jobs import load_jobs
+from product_catalog import ProductCatalog, model_summary
+
+DASHBOARD_PATH = os.environ.get("DASHBOARD_PATH", "dashboard.json")
+DASHBOARD_DAYS = int(os.environ.get("DASHBOARD_DAYS", "365"))
+MAX_POINTS     = int(os.environ.get("DASHBOARD_MAX_POINTS", "120"))
+TODAY_COLS = ["asin", "title", "model", "rank", "price", "url", "date", "rank_delta", "price_delta"]
+MODEL_COLS = ["model", "brand", "size_in", "asins", "best_rank", "min_price"]
+
+
+def _downsample(df: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """균등 간격으로 max_points 점 이하만 남기되 마지막 점은 항상 유지"""
+    if len(df) <= max_points:
+        return df
+    step = -(-len(df) // max_points)
+    keep = df.iloc[::-1].iloc[::step].iloc[::-1]
+    return keep
+
+
+def job_payload(job: dict, catalog: ProductCatalog, days: int = DASHBOARD_DAYS, max_points: int = MAX_POINTS):
+    """작업 1건 → {"name", "marketplace", "columns", "today", "models", "series"} (이력 없으면 None)"""
+    if not os.path.exists(job["history_db"]):
+        return None
+    start = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime("%Y-%m-%d")
+    with HistoryStore(job["history_db"]) as store:
+        series = store.daily_series(start=start)
+    if series.empty:
+        return None
+
+    # 최신 실행 목록 + 직전 실행 대비 변동
+    runs = series["run_date"].drop_duplicates().sort_values()
+    today = series[series["run_date"] == runs.iat[-1]].copy()
+    if len(runs) > 1:
+        prev = series.loc[series["run_date"] == runs.iat[-2], ["asin", "rank", "price"]]
+        today = today.merge(prev.rename(columns={"rank": "rank_prev", "price": "price_prev"}),
+                            on="asin", how="left")
+    else:
+        today["rank_prev"], today["price_prev"] = None, None
+    today = today.reset_index(drop=True)
+    today["rank_delta"]  = rank_delta(today["rank_prev"], today["rank"])
+    today["price_delta"] = price_delta(today["price_prev"], today["price"])
+    today["rank"] = today["rank"].astype(int)
+    today["model"] = [catalog.resolve(a, t)["model"] for a, t in zip(today["asin"], today["title"])]
+    models = model_summary(today, catalog)
+    models = models.astype(object).where(models.notna(), None)
+    today = today.rename(columns={"run_date": "date"}).sort_values("rank")[TODAY_COLS].fillna("")
+
+    # ASIN 별 하루 1점 시계열 (현재 목록에 있는 ASIN 만)
+    series = series[series["asin"].isin(set(today["asin"]))].copy()
+    series["day"] = series["run_date"].str[:10]
+    daily = series.sort_values("run_date").groupby(["asin", "day"], as_index=False).last()
+    daily["price_val"] = parse_prices(daily["price"]).round(2)
+    out_series = {}
+    for asin, g in daily.groupby("asin", sort=False):
+        g = _downsample(g, max_points)
+        out_series[asin] = {
+            "d": g["day"].tolist(),
+            "r": g["rank"].astype(int).tolist(),
+            "p": [None if pd.isna(v) else v for v in g["price_val"]],
+        }
+
+    return {
+        "name": job["name"],
+        "marketplace": job["marketplace"],
+        "columns": TODAY_COLS,
+        "today": today.values.tolist(),
+        "model_columns": MODEL_COLS,
+        "models": models[MODEL_COLS].values.tolist(),
+        "series": out_series,
+    }
+
+
+def build_dashboard(jobs, path: str = DASHBOARD_PATH, catalog: ProductCatalog = None) -> dict:
+    """작업 목록 → dashboard.json (공백 없는 최소 JSON)"""
+    own = catalog is None
+    catalog = catalog or ProductCatalog()
+    try:
+        payload = {
+            "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "jobs": [p for p in (job_payload(j, catalog) for j in jobs) if p],
+        }
+    finally:
+        if own:
+            catalog.close()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"), default=lambda o: o.item())
+    os.replace(tmp, path)
+    return payload
+
+
+if __name__ == "__main__":
+    data = build_dashboard(load_jobs())
+    print(f"{DASHBOARD_PATH}: 작업 {len(data['jobs'])}개")
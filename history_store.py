@@ -0,0 +1,190 @@
+# history_store.py
+"""
+로컬 가격·순위 이력 저장소 (SQLite)
+- history : (asin, date) 기본키 append-only 이력
+- latest  : ASIN 별 최신 1행 (append 시 함께 갱신되는 materialized 테이블)
+- 변동 계산은 latest 에서 오늘 ASIN 만 조회 → 이력 전체를 읽지 않음
+- 변경분만 기록: 신규·순위/가격 변동·재진입 행 + 목록 이탈(rank NULL, price_delta "exit") 행, 주기적 키프레임은 전체
+- runs : 실행 시각 목록 → daily_series() 가 변경분을 실행 시각마다 이어 붙여 전체 일별 시계열 복원
+- Google Sheets History 는 같은 변경분·이탈 행의 미러 → 저장소(캐시)가 없어도 시트로 초기화해
+  daily_series() 로 같은 시계열 복원 (변동 없는 날은 직전 행이 이어짐)
+"""
+
+import os, sqlite3, datetime
+import pandas as pd
+
+HISTORY_DB = os.environ.get("HISTORY_DB", "history.db")
+KEYFRAME_DAYS = int(os.environ.get("KEYFRAME_DAYS", "7"))   # 이 주기마다 변동 없어도 전체 행 기록
+HIST_COLS  = ["asin", "title", "rank", "price", "url", "date", "rank_delta", "price_delta"]
+EXIT_MARK  = "exit"     # 이탈 행의 price_delta (시트에서 이탈 행 구분용)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    asin        TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    title       TEXT,
+    rank        INTEGER,
+    price       TEXT,
+    url         TEXT,
+    rank_delta  TEXT,
+    price_delta TEXT,
+    PRIMARY KEY (asin, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_history_date ON history(date);
+CREATE TABLE IF NOT EXISTS latest (
+    asin  TEXT PRIMARY KEY,
+    date  TEXT NOT NULL,
+    rank  INTEGER,
+    price TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS runs (
+    date     TEXT PRIMARY KEY,
+    keyframe INTEGER NOT NULL DEFAULT 0,
+    n_rows   INTEGER
+) WITHOUT ROWID;
+"""
+
+# 이탈 행(rank NULL)은 직전 순위·가격을 보존한 채 present 만 0 으로
+_UPSERT_LATEST = """
+INSERT INTO latest (asin, date, rank, price, present) VALUES (?, ?, ?, ?, 1)
+ON CONFLICT(asin) DO UPDATE SET date = excluded.date, rank = excluded.rank,
+                                price = excluded.price, present = 1
+WHERE excluded.date >= latest.date
+"""
+_MARK_EXITED = "UPDATE latest SET present = 0, date = ? WHERE asin = ? AND date <= ?"
+
+
+class HistoryStore:
+    def __init__(self, path: str = HISTORY_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        cols = {r[1] for r in self.conn.execute("PRAGMA table_info(latest)")}
+        if "present" not in cols:   # 변경분 기록 이전에 만든 저장소
+            with self.conn:
+                self.conn.execute("ALTER TABLE latest ADD COLUMN present INTEGER NOT NULL DEFAULT 1")
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM latest LIMIT 1").fetchone() is None
+
+    def append(self, df: pd.DataFrame, run_date: str = None, keyframe: bool = False) -> int:
+        """
+        HIST_COLS 형식 행 추가 (같은 asin·date 는 덮어씀) + latest 갱신 → 행 수
+        - rank 가 빈 행은 목록 이탈로 기록 (latest 의 직전 값은 유지)
+        - run_date 를 주면 변경이 없어도 실행 시각을 runs 에 남김
+        """
+        if run_date:
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO runs (date, keyframe, n_rows) VALUES (?, ?, ?)",
+                                  (run_date, int(keyframe), len(df)))
+        if df.empty:
+            return 0
+        df = df.reindex(columns=HIST_COLS)
+        df = df[(df["asin"].astype(str).str.len() > 0) & df["date"].notna()]
+        df = df.astype(object).where(df.notna(), None)
+        # rank 는 열에 다시 넣으면 float64(None → NaN)가 되므로 튜플 단계에서 Python int / None 으로
+        rank_at = HIST_COLS.index("rank")
+        rows = [
+            row[:rank_at] + (None if pd.isna(row[rank_at]) or row[rank_at] == "" else int(row[rank_at]),)
+            + row[rank_at + 1:]
+            for row in df.itertuples(index=False, name=None)
+        ]
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO history ({','.join(HIST_COLS)}) "
+                f"VALUES ({','.join('?' * len(HIST_COLS))})",
+                rows,
+            )
+            self.conn.executemany(
+                _UPSERT_LATEST,
+                [(asin, date, rank, price) for asin, _, rank, price, _, date, *_ in rows
+                 if not pd.isna(rank)],
+            )
+            self.conn.executemany(
+                _MARK_EXITED,
+                [(date, asin, date) for asin, _, rank, _, _, date, *_ in rows if pd.isna(rank)],
+            )
+        return len(rows)
+
+    def keyframe_due(self, date: str, every_days: int = KEYFRAME_DAYS) -> bool:
+        """마지막 키프레임 이후 every_days 일 이상 지났으면 True (키프레임 없으면 True)"""
+        row = self.conn.execute("SELECT MAX(date) FROM runs WHERE keyframe = 1").fetchone()
+        if not row or not row[0]:
+            return True
+        last = datetime.datetime.fromisoformat(row[0])
+        return datetime.datetime.fromisoformat(date) - last >= datetime.timedelta(days=every_days)
+
+    def exits(self, asins_today, date: str) -> pd.DataFrame:
+        """직전까지 목록에 있었지만 오늘 없는 ASIN → 이탈 행 (rank 빈 값)"""
+        present = pd.read_sql_query("SELECT asin FROM latest WHERE present = 1", self.conn)["asin"]
+        gone = present[~present.isin(set(asins_today))]
+        out = pd.DataFrame({c: "" for c in HIST_COLS}, index=range(len(gone)))
+        out["asin"] = gone.to_numpy()
+        out["date"] = date
+        out["rank"] = None
+        out["price_delta"] = EXIT_MARK
+        return out[HIST_COLS]
+
+    def latest(self, asins=None) -> pd.DataFrame:
+        """ASIN 별 최신 [asin, date, rank, price, present] (asins 지정 시 해당 ASIN 만)"""
+        cols = "asin, date, rank, price, present"
+        if asins is None:
+            return pd.read_sql_query(f"SELECT {cols} FROM latest", self.conn)
+        asins = list(dict.fromkeys(asins))
+        if not asins:
+            return pd.DataFrame(columns=["asin", "date", "rank", "price", "present"])
+        marks = ",".join("?" * len(asins))
+        return pd.read_sql_query(
+            f"SELECT {cols} FROM latest WHERE asin IN ({marks})",
+            self.conn, params=asins,
+        )
+
+    def history(self, asin: str = None, start: str = None, end: str = None) -> pd.DataFrame:
+        """기간·ASIN 조건 이력 (date 오름차순)"""
+        where, params = [], []
+        if asin:
+            where.append("asin = ?"); params.append(asin)
+        if start:
+            where.append("date >= ?"); params.append(start)
+        if end:
+            where.append("date <= ?"); params.append(end)
+        sql = f"SELECT {','.join(HIST_COLS)} FROM history"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return pd.read_sql_query(sql + " ORDER BY date, rank", self.conn, params=params)
+
+    def daily_series(self, asin: str = None, start: str = None, end: str = None) -> pd.DataFrame:
+        """
+        실행 시각마다의 전체 목록 복원 [run_date, asin, title, rank, price, url]
+        - 각 실행 시각에 ASIN 별 직전 기록을 이어 붙이고(as-of), 이탈 상태인 ASIN 은 제외
+        - runs 가 없는 구 데이터는 이력에 있는 date 를 실행 시각으로 사용
+        """
+        events = self.history(asin=asin, end=end)
+        if events.empty:
+            return pd.DataFrame(columns=["run_date", "asin", "title", "rank", "price", "url"])
+        runs = pd.read_sql_query("SELECT date FROM runs UNION SELECT DISTINCT date FROM history",
+                                 self.conn)["date"]
+        run_dates = pd.Series(sorted(runs))
+        if start:
+            run_dates = run_dates[run_dates >= start]
+        if end:
+            run_dates = run_dates[run_dates <= end]
+
+        grid = pd.MultiIndex.from_product(
+            [pd.to_datetime(run_dates), events["asin"].unique()], names=["run_date", "asin"]
+        ).to_frame(index=False).sort_values("run_date")
+        events = events.assign(event_date=pd.to_datetime(events["date"])).sort_values("event_date")
+        out = pd.merge_asof(grid, events[["asin", "event_date", "title", "rank", "price", "url"]],
+                            left_on="run_date", right_on="event_date", by="asin", direction="backward")
+        out = out[out["rank"].notna()].drop(columns="event_date")
+        out["run_date"] = out["run_date"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        return out.sort_values(["run_date", "rank"]).reset_index(drop=True)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
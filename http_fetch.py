@@ -0,0 +1,70 @@
+# http_fetch.py
+"""
+requests 기반 경량 페이지 수집 백엔드 (Selenium 대안)
+- keep-alive 커넥션 풀을 쓰는 requests.Session 하나로 모든 페이지 요청
+- 통화·언어 쿠키 + 세션 캐시의 배송지(우편번호) 쿠키 그대로 사용
+- 429 / 5xx 는 지수 백오프로 재시도 (Retry-After 헤더 존중)
+- 원본 HTML 만 반환 → 파싱은 page_parser 가 담당
+"""
+
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/126.0 Safari/537.36"
+)
+LOCALE_COOKIES = {"lc-main": "de_DE", "i18n-prefs": "EUR"}
+
+
+class HttpFetcher:
+    """쿠키·재시도 정책이 적용된 requests.Session 래퍼"""
+
+    def __init__(self, cookies=(), locale_cookies=LOCALE_COOKIES, timeout: float = 15,
+                 retries: int = 3, backoff: float = 1.0, pool_size: int = 4,
+                 accept_language: str = "de-DE,de;q=0.9"):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+                respect_retry_after_header=True,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": accept_language,
+        })
+        # 세션 캐시(Selenium 쿠키 형식) → requests 쿠키
+        for c in cookies:
+            self.session.cookies.set(c["name"], c["value"],
+                                     domain=c.get("domain", ""), path=c.get("path", "/"))
+        for name, value in locale_cookies.items():
+            self.session.cookies.set(name, value)
+
+    def fetch(self, url: str) -> str:
+        """url 의 HTML 텍스트 (재시도 후에도 실패하면 requests 예외)"""
+        resp = self.session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        logging.info(f"🌐 HTTP {resp.status_code} {url} ({len(resp.content) / 1024:.0f} KB)")
+        return resp.text
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
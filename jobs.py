@@ -0,0 +1,66 @@
+# jobs.py
+"""
+크롤링 작업(job) 설정
+- 작업 = (마켓플레이스, 베스트셀러 카테고리, 브랜드 필터, 배송지 우편번호)
+- JOBS_FILE(기본 jobs.json) 에서 읽고, 없으면 기존 단일 작업(Amazon.de 모니터 · LG)으로 동작
+- 작업별 이력 저장소 파티션(history/<name>.db)과 시트 탭 이름을 함께 결정
+
+jobs.json 예)
+[
+  {"name": "de_monitors_lg", "marketplace": "de", "category": "computers/429868031",
+   "brands": ["LG"], "zip": "65760", "history_sheet": "History", "today_sheet": "Today"},
+  {"name": "fr_monitors", "marketplace": "fr", "category": "computers/<카테고리 ID>",
+   "brands": ["LG", "Samsung", "Dell"], "zip": "75001"}
+]
+"""
+
+import os, json
+
+JOBS_FILE   = os.environ.get("JOBS_FILE", "jobs.json")
+HISTORY_DIR = os.environ.get("HISTORY_DIR", "history")
+
+# lc-main / i18n-prefs 쿠키 값, 브라우저 언어, 가격 통화 기호
+MARKETPLACES = {
+    "de": {"site": "https://www.amazon.de/",    "locale": "de_DE", "currency": "EUR", "symbol": "€", "lang": "de-DE"},
+    "fr": {"site": "https://www.amazon.fr/",    "locale": "fr_FR", "currency": "EUR", "symbol": "€", "lang": "fr-FR"},
+    "it": {"site": "https://www.amazon.it/",    "locale": "it_IT", "currency": "EUR", "symbol": "€", "lang": "it-IT"},
+    "es": {"site": "https://www.amazon.es/",    "locale": "es_ES", "currency": "EUR", "symbol": "€", "lang": "es-ES"},
+    "uk": {"site": "https://www.amazon.co.uk/", "locale": "en_GB", "currency": "GBP", "symbol": "£", "lang": "en-GB"},
+}
+
+DEFAULT_JOBS = [{
+    "name": "de_monitors_lg",
+    "marketplace": "de",
+    "category": "computers/429868031",
+    "brands": ["LG"],
+    "zip": "65760",
+    "history_sheet": "History",
+    "today_sheet": "Today",
+}]
+
+
+def build_job(spec: dict) -> dict:
+    """설정 1건 → 기본값·마켓플레이스 정보가 채워진 작업 dict"""
+    job = {"pages": [1, 2], "brands": ["LG"], **spec}
+    mp = MARKETPLACES[job["marketplace"]]
+    job.update({k: v for k, v in mp.items() if k not in job})
+    job["base_url"] = f"{mp['site']}gp/bestsellers/{job['category'].strip('/')}/"
+    job.setdefault("history_sheet", f"History_{job['name']}")
+    job.setdefault("today_sheet", f"Today_{job['name']}")
+    job.setdefault("history_db", os.path.join(HISTORY_DIR, f"{job['name']}.db"))
+    # 같은 마켓플레이스·우편번호 작업끼리 드라이버·세션 공유
+    job["session"] = f"amazon_{job['marketplace']}_{job['zip']}".replace(" ", "")
+    return job
+
+
+def load_jobs(path: str = JOBS_FILE) -> list:
+    try:
+        with open(path, encoding="utf-8") as f:
+            specs = json.load(f)
+    except FileNotFoundError:
+        specs = DEFAULT_JOBS
+    jobs = [build_job(s) for s in specs]
+    names = [j["name"] for j in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"중복된 작업 이름: {names}")
+    return jobs
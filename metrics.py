@@ -0,0 +1,84 @@
+# metrics.py
+"""
+크롤링 파이프라인 단계별 계측
+- METRICS.stage("이름") 컨텍스트로 소요 시간 누적 (호출 수 · 합계 · 최대)
+- METRICS.count("이름") 으로 재시도·셀렉터 실패 등 카운터 증가
+- 실행 종료 시 write() → run_summary.json(이번 실행) + runs.jsonl(누적, 일별 비교용)
+  + crawl.prom(Prometheus textfile collector 형식)
+"""
+
+import os, json, time, threading, datetime
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+METRICS_DIR = os.environ.get("METRICS_DIR", "metrics")
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.timings = defaultdict(list)
+        self.counters = Counter()
+        self.info = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            with self._lock:
+                self.timings[name].append(dt)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def set(self, name: str, value):
+        """단계 외 부가 정보 (페이지 통계, 행 수 등)"""
+        with self._lock:
+            self.info[name] = value
+
+    def summary(self) -> dict:
+        with self._lock:
+            stages = {
+                name: {"count": len(v), "total_sec": round(sum(v), 3), "max_sec": round(max(v), 3)}
+                for name, v in sorted(self.timings.items())
+            }
+            return {
+                "run_at": datetime.datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "total_sec": round(time.time() - self.started, 3),
+                "stages": stages,
+                "counters": dict(sorted(self.counters.items())),
+                "info": dict(self.info),
+            }
+
+    def prometheus(self, summary: dict = None) -> str:
+        s = summary or self.summary()
+        lines = [
+            "# TYPE crawl_run_seconds gauge",
+            f"crawl_run_seconds {s['total_sec']}",
+            "# TYPE crawl_stage_seconds gauge",
+        ]
+        lines += [f'crawl_stage_seconds{{stage="{k}"}} {v["total_sec"]}' for k, v in s["stages"].items()]
+        lines.append("# TYPE crawl_stage_calls gauge")
+        lines += [f'crawl_stage_calls{{stage="{k}"}} {v["count"]}' for k, v in s["stages"].items()]
+        lines.append("# TYPE crawl_events_total counter")
+        lines += [f'crawl_events_total{{event="{k}"}} {v}' for k, v in s["counters"].items()]
+        return "\n".join(lines) + "\n"
+
+    def write(self, out_dir: str = METRICS_DIR) -> dict:
+        s = self.summary()
+        os.makedirs(out_dir, exist_ok=True)
+        with open(os.path.join(out_dir, "run_summary.json"), "w", encoding="utf-8") as f:
+            json.dump(s, f, ensure_ascii=False, indent=2)
+        with open(os.path.join(out_dir, "runs.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(s, ensure_ascii=False) + "\n")
+        with open(os.path.join(out_dir, "crawl.prom"), "w", encoding="utf-8") as f:
+            f.write(self.prometheus(s))
+        return s
+
+
+METRICS = Metrics()
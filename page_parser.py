@@ -0,0 +1,152 @@
+# page_parser.py
+"""
+Amazon.de 베스트셀러 페이지 HTML 오프라인 파서
+- 브라우저 없이 저장된 page_source(bytes / 파일 경로)만으로 카드 파싱
+- crawl.py 의 카드 셀렉터 우선순위(랭크·제목·가격·링크)를 lxml 로 그대로 재현
+- 결과는 크롤러(crawl.py)가 쓰는 {"asin","title","url","price","rank"} 레코드
+- 브랜드 필터·통화 기호는 작업(job)별로 지정 (기본 LG · €)
+- catalog(ProductCatalog) 를 넘기면 브랜드는 ASIN 별 캐시 조회, 없으면 제목 정규식
+- 여러 페이지 일괄 파싱 (프로세스 풀) → 보관된 HTML 로 과거 이력 재생성
+
+사용 예) python page_parser.py raw_pages/*.html > cards.jsonl
+"""
+
+import os, re, sys, json, logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from urllib.parse import urljoin
+from lxml import etree, html as lxml_html
+from metrics import METRICS
+
+SITE_URL = "https://www.amazon.de/"
+CARDS_XPATH = "//div[contains(@class,'a-cardui') and contains(@class,'_cDEzb_card')]//ol/li"
+
+# ─── 셀렉터 (컴파일 1회, 카드마다 재사용) ─────────────────────────
+_CARDS   = etree.XPath(CARDS_XPATH)
+_RANK    = etree.XPath('.//span[contains(text(), "#")]')
+_TITLE   = etree.XPath('.//div[contains(@class,"_cDEzb_p13n-sc-css-line-clamp-2_EWgCb")]')
+_IMG_ALT = etree.XPath('.//img[@alt]/@alt')
+_LINK    = etree.XPath('.//a[contains(@href,"/dp/")]/@href')
+_PRICES  = [
+    etree.XPath('.//span[@class="a-offscreen"]'),
+    etree.XPath('.//span[contains(concat(" ",normalize-space(@class)," ")," a-price ")]'
+                '/span[contains(concat(" ",normalize-space(@class)," ")," a-offscreen ")]'),
+    etree.XPath('.//*[contains(@class, "price")]'),
+    etree.XPath('.//span[contains(concat(" ",normalize-space(@class)," ")," p13n-sc-price ")]'),
+]
+ASIN_RE = re.compile(r"/dp/([A-Z0-9]{10})")
+DEFAULT_BRANDS = ("LG",)
+
+
+@lru_cache(maxsize=64)
+def brand_regex(brands: tuple):
+    """브랜드 목록 → 단어 경계 대소문자 무시 정규식 (목록별 1회 컴파일)"""
+    return re.compile(r"\b(" + "|".join(re.escape(b) for b in brands) + r")\b", re.I)
+
+
+def match_brand(title: str, brands=DEFAULT_BRANDS) -> str:
+    """제목에서 찾은 브랜드 (brands 표기 그대로), 없으면 빈 문자열"""
+    m = brand_regex(tuple(brands)).search(title)
+    if not m:
+        return ""
+    found = m.group(1).lower()
+    return next((b for b in brands if b.lower() == found), m.group(1))
+
+
+def _first_text(xpath, node) -> str:
+    found = xpath(node)
+    return found[0].text_content().strip() if found else ""
+
+
+def _load(source):
+    """bytes / HTML 문자열 / 파일 경로 → lxml 트리 (bytes 는 UTF-8 로 해석)"""
+    if isinstance(source, (str, os.PathLike)) and not str(source).lstrip().startswith("<"):
+        with open(source, "rb") as f:
+            source = f.read()
+    if isinstance(source, bytes):
+        # <meta charset> 가 없으면 lxml 은 latin-1 로 읽어 '€'·움라우트가 깨짐 → page_source 와 같은 UTF-8
+        source = source.decode("utf-8", errors="replace")
+    return lxml_html.fromstring(source)
+
+
+def parse_cards(source, base_url: str = SITE_URL, brands=DEFAULT_BRANDS, currency: str = "€",
+                catalog=None) -> list:
+    """페이지의 모든 카드 → CARD_DATA 형식 dict 목록 (브랜드 일치 여부 포함)"""
+    doc = _load(source)
+    cards = []
+    for idx, li in enumerate(_CARDS(doc), start=1):
+        rank_digits = re.sub(r"\D", "", _first_text(_RANK, li))
+        if not rank_digits:
+            logging.warning(f"[{idx}] 랭크 추출 실패 → 건너뜀")
+            METRICS.count("selector_fail.rank")
+            continue
+
+        title = _first_text(_TITLE, li)
+        if not title:
+            alts = _IMG_ALT(li)
+            title = alts[0].strip() if alts else ""
+        title = title.replace("\u00a0", " ").replace("\u202f", " ")
+
+        price_raw = ""
+        for xpath in _PRICES:
+            txt = _first_text(xpath, li)
+            if currency in txt:
+                price_raw = txt
+                break
+        if not price_raw:
+            logging.warning(f"[{idx}] 가격 추출 실패 → 빈 문자열로 대체")
+            METRICS.count("selector_fail.price")
+
+        links = _LINK(li)
+        href = urljoin(base_url, links[0]).split("?", 1)[0] if links else ""
+        m = ASIN_RE.search(href)
+        if not m:
+            logging.warning(f"[{idx}] 링크/ASIN 추출 실패 → 건너뜀")
+            METRICS.count("selector_fail.link")
+            continue
+
+        cards.append({
+            "rank": int(rank_digits),
+            "title": title,
+            "price_text": price_raw,
+            "asin": m.group(1),
+            "url": href,
+            "brand": catalog.match(m.group(1), title, brands) if catalog else match_brand(title, brands),
+        })
+    return cards
+
+
+def to_records(cards) -> list:
+    """CARD_DATA 목록 → 브랜드 필터 후 시트 기록용 레코드"""
+    return [
+        {"asin": c["asin"], "title": c["title"], "url": c["url"],
+         "price": c["price_text"], "rank": c["rank"]}
+        for c in cards if c["brand"]
+    ]
+
+
+def parse_page(source, base_url: str = SITE_URL, brands=DEFAULT_BRANDS, currency: str = "€",
+               catalog=None) -> list:
+    """크롤러(crawl.py)가 쓰는 브랜드 필터 레코드 목록"""
+    return to_records(parse_cards(source, base_url, brands, currency, catalog))
+
+
+def _parse_file(path):
+    return path, parse_cards(path)
+
+
+def parse_many(paths, workers: int = None):
+    """여러 HTML 파일을 프로세스 풀로 파싱 → (path, cards) 를 입력 순서대로 yield"""
+    paths = list(paths)
+    if workers == 1 or len(paths) < 4:
+        yield from map(_parse_file, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_parse_file, paths, chunksize=8)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    for path, cards in parse_many(sys.argv[1:]):
+        for card in cards:
+            print(json.dumps({"file": path, **card}, ensure_ascii=False))
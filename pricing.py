@@ -0,0 +1,67 @@
+# pricing.py
+"""
+가격 파싱 · 순위/가격 변동 계산 (벡터화)
+- "1.299,00 €" / "€1,299.00" / "299,99 €" / "1.299 €" 모두 같은 규칙으로 파싱
+  → 마지막 구분자(. 또는 ,) 뒤 숫자가 1~2자리면 소수점, 나머지 구분자는 천 단위
+- "199,99 € - 249,99 €" 같은 가격 범위는 첫 가격만 사용
+- 행 단위 apply 없이 pandas 문자열 접근자 + NumPy 연산만 사용
+- 가격 비교는 정수 센트 기준 (부동소수 오차 없이 동일가 판정)
+"""
+
+import numpy as np
+import pandas as pd
+
+UP, DOWN, SAME = "▴", "▾", "-"
+
+_TOKEN_RE = r"(\d(?:[\d.,\s]*\d)?)"     # 첫 가격 토큰 (공백·NBSP 천 단위 구분 포함)
+_PRICE_RE = r"^(?P<int>[\d.,]*?)(?:[.,](?P<dec>\d{1,2}))?$"
+
+
+def price_cents(prices) -> pd.Series:
+    """가격 문자열 Series → 정수 센트 (Int64, 파싱 불가 시 <NA>)"""
+    txt = pd.Series(prices, dtype="string").str.extract(_TOKEN_RE, expand=False)
+    txt = txt.str.replace(r"\s", "", regex=True)
+    parts = txt.str.extract(_PRICE_RE)
+    whole = parts["int"].str.replace(r"[.,]", "", regex=True)
+    whole = pd.to_numeric(whole.replace("", pd.NA), errors="coerce")
+    dec = pd.to_numeric(parts["dec"].str.ljust(2, "0"), errors="coerce").fillna(0)
+    return (whole * 100 + dec).round().astype("Int64")
+
+
+def parse_prices(prices) -> pd.Series:
+    """가격 문자열 Series → float64 (파싱 불가 시 NaN)"""
+    return price_cents(prices).astype("Float64").div(100).astype("float64")
+
+
+def price_to_float(txt: str):
+    """단일 가격 문자열 → float (parse_prices 의 스칼라 버전)"""
+    return parse_prices([txt]).iloc[0]
+
+
+def _markers(diff: pd.Series, fmt: str, scale: float = 1) -> pd.Series:
+    """부호 있는 차이 → "▴n" / "▾n" / "-" (diff 결측·0 은 "-")"""
+    diff = diff.astype("Float64")
+    if diff.empty:
+        return pd.Series([], index=diff.index, dtype=object)
+    up   = (diff > 0).fillna(False).to_numpy(dtype=bool)
+    down = (diff < 0).fillna(False).to_numpy(dtype=bool)
+    mag  = (diff.abs() / scale).fillna(0).to_numpy(dtype="float64")
+    text = np.char.mod(fmt, mag)
+    out = np.full(len(diff), SAME, dtype=object)
+    out[up]   = np.char.add(UP, text[up])
+    out[down] = np.char.add(DOWN, text[down])
+    return pd.Series(out, index=diff.index, dtype=object)
+
+
+def rank_delta(rank_prev, rank_curr) -> pd.Series:
+    """순위 상승(숫자 감소) ▴, 하락 ▾ — 두 Series 는 같은 인덱스"""
+    prev = pd.to_numeric(pd.Series(rank_prev), errors="coerce")
+    curr = pd.to_numeric(pd.Series(rank_curr), errors="coerce")
+    return _markers(prev - curr, "%d")
+
+
+def price_delta(price_prev, price_curr) -> pd.Series:
+    """가격 인상 ▴, 인하 ▾ (통화 단위 소수 둘째 자리) — 두 Series 는 같은 인덱스"""
+    prev = price_cents(price_prev)
+    curr = price_cents(price_curr)
+    return _markers(curr - prev, "%.2f", scale=100)
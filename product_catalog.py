@@ -0,0 +1,252 @@
+# product_catalog.py
+"""
+ASIN → 제품 정보(브랜드 · 모델 코드 · 화면 크기 · 해상도 · 주사율 · 패널) 카탈로그
+- 제목에서 한 번만 추출해 SQLite(CATALOG_DB)에 저장, 이후 실행은 ASIN 기본키 조회로 끝
+- 메모리 앞단 LRU(MEMORY_SIZE) → 디스크 → 추출 순, 제목이 바뀐 ASIN 만 다시 추출
+- 디스크는 last_seen(일 단위) 기준 LRU — CATALOG_MAX_ROWS 를 넘으면 오래 안 보인 ASIN 부터 삭제
+- model · brand 인덱스로 같은 모델의 여러 ASIN(색상·판매자 변형) 묶음 조회
+- 브랜드 필터는 제목에 나오는 알려진 브랜드 전체(brands)로 판정 → 제목 정규식(match_brand)과 같은 결과
+
+사용 예) python product_catalog.py "LG UltraGear 27GR95QE-B 27 Zoll OLED Gaming Monitor, 240Hz"
+"""
+
+import os, re, sys, json, sqlite3, datetime, threading
+from collections import OrderedDict
+import pandas as pd
+from pricing import parse_prices
+from page_parser import match_brand
+
+CATALOG_DB       = os.environ.get("CATALOG_DB", os.path.join("history", "catalog.db"))
+CATALOG_MAX_ROWS = int(os.environ.get("CATALOG_MAX_ROWS", "50000"))
+MEMORY_SIZE      = int(os.environ.get("CATALOG_MEMORY_SIZE", "4096"))
+EXTRACT_VERSION  = 2        # 추출 규칙을 바꾸면 올려서 기존 항목 재추출
+FIELDS = ["asin", "title", "brand", "brands", "model", "variant", "size_in", "resolution", "refresh_hz", "panel"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    asin       TEXT PRIMARY KEY,
+    title      TEXT NOT NULL,
+    brand      TEXT,
+    brands     TEXT,
+    model      TEXT,
+    variant    TEXT,
+    size_in    REAL,
+    resolution TEXT,
+    refresh_hz INTEGER,
+    panel      TEXT,
+    version    INTEGER NOT NULL,
+    last_seen  TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_catalog_model ON catalog(model);
+CREATE INDEX IF NOT EXISTS idx_catalog_brand ON catalog(brand);
+CREATE INDEX IF NOT EXISTS idx_catalog_seen  ON catalog(last_seen);
+"""
+
+# ─── 제목 → 제품 정보 추출 규칙 ─────────────────────────────────
+KNOWN_BRANDS = (
+    "LG", "Samsung", "Dell", "Alienware", "ASUS", "Acer", "BenQ", "MSI", "AOC", "Philips",
+    "Lenovo", "HP", "Gigabyte", "iiyama", "ViewSonic", "Xiaomi", "Huawei", "KOORUI",
+    "Sony", "Apple", "Eizo", "Fujitsu", "Corsair", "Razer", "Gawfolk", "Innocn", "Sceptre",
+)
+_BRAND_RE = re.compile(r"\b(" + "|".join(re.escape(b) for b in KNOWN_BRANDS) + r")\b", re.I)
+_BRAND_CANON = {b.lower(): b for b in KNOWN_BRANDS}
+
+# 영문·숫자가 섞인 5~14자 토큰 (+ -B · -W 같은 색상 변형 접미사)
+_MODEL_RE = re.compile(r"\b((?=[A-Z0-9]*\d)(?=[A-Z0-9]*[A-Z])[A-Z0-9]{5,14})(?:-([A-Z0-9]{1,4}))?\b")
+_NOT_MODEL = re.compile(
+    r"^(\d+(HZ|MS|K|P|W|GB|TB|CM|MM|NITS|CD|ZOLL|INCH)|\d+X\d+|HDMI\d*|USB\w*|HDR\d+|DP\d+|"
+    r"G(SYNC|\d)|FREESYNC\w*|DISPLAYHDR\d*|\d+(K|P)\d*)$"
+)
+_SIZE_IN = re.compile(r"(\d{2}(?:[.,]\d)?)\s*(?:Zoll|\"|''|”|″|-?inch|pouces|pollici|pulgadas)", re.I)
+_SIZE_CM = re.compile(r"(\d{2,3}(?:[.,]\d{1,2})?)\s*cm\b", re.I)   # 68,58 cm 처럼 소수 둘째 자리까지
+_REFRESH = re.compile(r"(\d{2,3})\s*Hz\b", re.I)
+_RESOLUTIONS = [   # 앞쪽 규칙 우선
+    ("5K2K",  re.compile(r"5120\s*[x×]\s*2160|\b5K2K\b", re.I)),
+    ("5K",    re.compile(r"5120\s*[x×]\s*2880|\b5K\b", re.I)),
+    ("4K",    re.compile(r"3840\s*[x×]\s*2160|\b(4K|UHD)\b", re.I)),
+    ("UWQHD", re.compile(r"3440\s*[x×]\s*1440|\bUWQHD\b|\bWQHD\+", re.I)),
+    ("QHD",   re.compile(r"2560\s*[x×]\s*1440|\b(W?QHD|1440p)\b", re.I)),
+    ("UWFHD", re.compile(r"2560\s*[x×]\s*1080|\bUW-?FHD\b", re.I)),
+    ("FHD",   re.compile(r"1920\s*[x×]\s*1080|\b(Full[\s-]?HD|FHD|1080p)\b", re.I)),
+]
+_PANELS = [
+    ("OLED",     re.compile(r"\bW?OLED\b", re.I)),
+    ("Nano IPS", re.compile(r"\bNano[\s-]?IPS\b", re.I)),
+    ("IPS",      re.compile(r"\bIPS\b", re.I)),
+    ("VA",       re.compile(r"\bVA\b")),
+    ("TN",       re.compile(r"\bTN\b")),
+]
+
+
+def _first(rules, title: str) -> str:
+    return next((name for name, rx in rules if rx.search(title)), "")
+
+
+def extract(asin: str, title: str) -> dict:
+    """제목 1건 → 제품 정보 dict (FIELDS), 못 찾은 항목은 빈 값 (brands 는 제목 순 알려진 브랜드 "," 연결)"""
+    found = list(dict.fromkeys(_BRAND_CANON[b.lower()] for b in _BRAND_RE.findall(title)))
+    if found:
+        brand = found[0]
+    else:   # 목록에 없는 브랜드는 제목 첫 단어 (Amazon 제목은 대부분 브랜드로 시작)
+        brand = (title.split() or [""])[0].strip(",:-|")
+
+    model, variant = "", ""
+    for mm in _MODEL_RE.finditer(title.upper()):
+        if not _NOT_MODEL.match(mm.group(1)):
+            model, variant = mm.group(1), mm.group(2) or ""
+            break
+
+    size = None
+    if (s := _SIZE_IN.search(title)):
+        size = float(s.group(1).replace(",", "."))
+    elif (s := _SIZE_CM.search(title)):
+        size = round(float(s.group(1).replace(",", ".")) / 2.54, 1)
+    elif model[:2].isdigit() and 19 <= int(model[:2]) <= 57:   # LG 27GR95QE 처럼 크기로 시작하는 모델
+        size = float(model[:2])
+
+    hz = _REFRESH.search(title)
+    return {
+        "asin": asin,
+        "title": title,
+        "brand": brand,
+        "brands": ",".join(found),
+        "model": model,
+        "variant": variant,
+        "size_in": size,
+        "resolution": _first(_RESOLUTIONS, title),
+        "refresh_hz": int(hz.group(1)) if hz else None,
+        "panel": _first(_PANELS, title),
+    }
+
+
+class ProductCatalog:
+    """ASIN 기본키 조회 카탈로그 (메모리 LRU + SQLite), 여러 스레드에서 공유 가능"""
+
+    def __init__(self, path: str = CATALOG_DB, max_rows: int = CATALOG_MAX_ROWS,
+                 memory_size: int = MEMORY_SIZE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        cols = {r[1] for r in self.conn.execute("PRAGMA table_info(catalog)")}
+        if "brands" not in cols:    # 브랜드 목록 저장 이전에 만든 카탈로그 (EXTRACT_VERSION 으로 재추출)
+            with self.conn:
+                self.conn.execute("ALTER TABLE catalog ADD COLUMN brands TEXT")
+        self.max_rows, self.memory_size = max_rows, memory_size
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self.today = datetime.date.today().isoformat()
+        self.hits = self.misses = 0
+
+    def _remember(self, entry: dict):
+        self._mem[entry["asin"]] = entry
+        self._mem.move_to_end(entry["asin"])
+        if len(self._mem) > self.memory_size:
+            self._mem.popitem(last=False)
+
+    def _row(self, asin: str):
+        cur = self.conn.execute(
+            f"SELECT {','.join(FIELDS)}, version, last_seen FROM catalog WHERE asin = ?", (asin,))
+        row = cur.fetchone()
+        return dict(zip(FIELDS + ["version", "last_seen"], row)) if row else None
+
+    def resolve(self, asin: str, title: str) -> dict:
+        """ASIN·제목 → 제품 정보 (메모리 → 디스크 → 추출 순, 제목이 바뀌었으면 재추출)"""
+        with self._lock:
+            entry = self._mem.get(asin)
+            if entry is None or entry["title"] != title:
+                entry = self._row(asin)
+            if entry is not None and entry["title"] == title and entry["version"] == EXTRACT_VERSION:
+                self.hits += 1
+                if entry["last_seen"] != self.today:
+                    entry["last_seen"] = self.today
+                    with self.conn:
+                        self.conn.execute("UPDATE catalog SET last_seen = ? WHERE asin = ?",
+                                          (self.today, asin))
+            else:
+                self.misses += 1
+                entry = {**extract(asin, title), "version": EXTRACT_VERSION, "last_seen": self.today}
+                with self.conn:
+                    self.conn.execute(
+                        f"INSERT OR REPLACE INTO catalog ({','.join(entry)}) "
+                        f"VALUES ({','.join('?' * len(entry))})",
+                        tuple(entry.values()),
+                    )
+            self._remember(entry)
+            return entry
+
+    def match(self, asin: str, title: str, brands) -> str:
+        """match_brand(title, brands) 와 같은 결과 — 제목의 알려진 브랜드 중 brands 에 있는 첫 브랜드"""
+        if any(b.lower() not in _BRAND_CANON for b in brands):
+            # KNOWN_BRANDS 에 없는 브랜드 필터는 예전처럼 제목 단어 경계 검색
+            return match_brand(title, brands)
+        wanted = {b.lower(): b for b in brands}
+        found = self.resolve(asin, title)["brands"] or ""
+        return next((wanted[b.lower()] for b in found.split(",") if b.lower() in wanted), "")
+
+    def get(self, asin: str):
+        """저장된 제품 정보 (추출 없이 조회만), 없으면 None"""
+        with self._lock:
+            entry = self._mem.get(asin) or self._row(asin)
+            if entry is not None:
+                self._remember(entry)
+            return entry
+
+    def _select(self, where: str, value) -> list:
+        with self._lock:
+            cur = self.conn.execute(f"SELECT {','.join(FIELDS)} FROM catalog WHERE {where} = ?", (value,))
+            return [dict(zip(FIELDS, r)) for r in cur.fetchall()]
+
+    def by_model(self, model: str) -> list:
+        """같은 모델 코드의 모든 ASIN (색상·판매자 변형 포함)"""
+        return self._select("model", model.upper())
+
+    def by_brand(self, brand: str) -> list:
+        return self._select("brand", _BRAND_CANON.get(brand.lower(), brand))
+
+    def evict(self) -> int:
+        """max_rows 초과분을 last_seen 오래된 순으로 삭제 → 삭제 행 수"""
+        with self._lock, self.conn:
+            n = self.conn.execute("SELECT COUNT(*) FROM catalog").fetchone()[0]
+            if n <= self.max_rows:
+                return 0
+            self.conn.execute(
+                "DELETE FROM catalog WHERE asin IN "
+                "(SELECT asin FROM catalog ORDER BY last_seen, asin LIMIT ?)", (n - self.max_rows,))
+            self._mem.clear()
+            return n - self.max_rows
+
+    def close(self):
+        self.evict()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def model_summary(df: pd.DataFrame, catalog: ProductCatalog) -> pd.DataFrame:
+    """
+    ASIN 별 [asin, rank, price] → 모델별 [model, brand, size_in, asins, best_rank, min_price] (최고 순위순)
+    - 모델 코드를 못 찾은 ASIN 은 ASIN 자체를 모델로 취급
+    """
+    info = pd.DataFrame([catalog.get(a) or {"asin": a} for a in df["asin"]],
+                        columns=["asin", "model", "brand", "size_in"])
+    out = df[["asin", "rank", "price"]].merge(info, on="asin", how="left")
+    out["model"] = out["model"].replace("", None).fillna(out["asin"])
+    out["price_val"] = parse_prices(out["price"])
+    out = out.groupby("model", as_index=False, sort=False).agg(
+        brand=("brand", "first"),
+        size_in=("size_in", "first"),
+        asins=("asin", list),
+        best_rank=("rank", "min"),
+        min_price=("price_val", "min"),
+    )
+    return out.sort_values("best_rank").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    for i, t in enumerate(sys.argv[1:]):
+        print(json.dumps(extract(f"ARG{i}", t), ensure_ascii=False))
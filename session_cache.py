@@ -0,0 +1,86 @@
+# session_cache.py
+"""
+브라우저 세션(쿠키 + localStorage) 디스크 캐시
+- 배송지 설정·로그인 성공 직후 save_session() 으로 저장
+- 다음 실행에서 restore_session() 으로 복원 → 유효성은 호출 측에서 가볍게 확인
+- 만료·손상 시 False 반환 → 호출 측이 전체 설정 절차를 다시 수행
+"""
+
+import os, json, time, logging, threading
+
+SESSION_DIR     = os.environ.get("SESSION_DIR", ".session")
+SESSION_MAX_AGE = int(os.environ.get("SESSION_MAX_AGE", str(7 * 24 * 3600)))   # 초
+
+_LOCAL_STORAGE_DUMP = "return Object.assign({}, window.localStorage);"
+_LOCAL_STORAGE_LOAD = """
+const items = arguments[0];
+for (const k in items) { window.localStorage.setItem(k, items[k]); }
+"""
+
+
+def _path(name: str) -> str:
+    return os.path.join(SESSION_DIR, f"{name}.json")
+
+
+def _load_state(name: str):
+    """저장된 세션 dict, 없거나 손상·만료면 None"""
+    try:
+        with open(_path(name), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    age = time.time() - state.get("saved_at", 0)
+    if age > SESSION_MAX_AGE:
+        logging.info(f"⌛ 세션 만료: {name} ({age / 3600:.0f}시간 경과)")
+        return None
+    return state
+
+
+def save_session(driver, name: str) -> None:
+    """현재 도메인의 쿠키·localStorage 저장 (원자적 쓰기)"""
+    state = {
+        "saved_at": time.time(),
+        "cookies": driver.get_cookies(),
+        "local_storage": driver.execute_script(_LOCAL_STORAGE_DUMP) or {},
+    }
+    os.makedirs(SESSION_DIR, exist_ok=True)
+    tmp = f"{_path(name)}.{os.getpid()}.{threading.get_ident()}.tmp"   # 같은 프로세스의 스레드끼리도 겹치지 않게
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, _path(name))
+    logging.info(f"💾 세션 저장: {name} (쿠키 {len(state['cookies'])}개)")
+
+
+def restore_session(driver, name: str, url: str) -> bool:
+    """저장된 세션을 url 도메인에 적용 후 새로고침 → 적용 여부"""
+    state = _load_state(name)
+    if state is None:
+        return False
+
+    driver.get(url)   # 쿠키는 같은 도메인이 열린 상태에서만 추가 가능
+    for cookie in state.get("cookies", []):
+        cookie = {k: v for k, v in cookie.items() if k != "sameSite"}
+        if "expiry" in cookie:
+            cookie["expiry"] = int(cookie["expiry"])
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            continue
+    if state.get("local_storage"):
+        driver.execute_script(_LOCAL_STORAGE_LOAD, state["local_storage"])
+    driver.refresh()
+    logging.info(f"♻️ 세션 복원: {name}")
+    return True
+
+
+def drop_session(name: str) -> None:
+    try:
+        os.remove(_path(name))
+    except OSError:
+        pass
+
+
+def load_cookies(name: str) -> list:
+    """저장된 세션의 쿠키 목록 (HTTP 백엔드 재사용용), 없거나 만료면 빈 목록"""
+    state = _load_state(name)
+    return state.get("cookies", []) if state else []
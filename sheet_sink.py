@@ -0,0 +1,222 @@
+# sheet_sink.py
+"""
+Google Sheets 일괄 기록기
+- 메타데이터 조회 1회(History 헤더 유무용 A1 셀 포함) + 구조 batchUpdate 1회(탭 추가 · Today 비우기 · 서식 규칙)
+- 값은 USER_ENTERED 로 기록 (날짜·가격이 기존 행처럼 날짜·숫자 셀로 해석)
+  → Today 는 values.batchUpdate, History 는 values.append 각 1회
+- 셀 단위 CellFormat 대신 Today G:H 열 조건부 서식 규칙(▴ 초록 / ▾ 빨강) — 최초 1회만 추가
+- 429 / 5xx 응답은 지수 백오프 재시도 (History 추가는 멱등이 아니라 429 만 — 5xx 는 이미 반영됐을 수 있음)
+- SHEET_DRY_RUN=1 이면 FakeSpreadsheet 로 요청 본문만 파일에 기록 (API 호출 없음)
+"""
+
+import os, json, time, random, logging, datetime
+from gspread.exceptions import APIError
+from metrics import METRICS
+
+HIST_SHEET, TODAY_SHEET = "History", "Today"
+DELTA_COLS = (6, 8)                 # Today 의 rank_delta(G) ~ price_delta(H), 0-based 끝 미포함
+RETRY_STATUS = (429, 500, 502, 503)
+APPEND_RETRY_STATUS = (429,)        # 요청이 처리되지 않았다고 확신할 수 있는 응답만
+MAX_RETRIES  = 5
+DRY_RUN_PATH = os.environ.get("SHEET_DRY_RUN_PATH", "sheet_dry_run.json")
+
+SERIAL_EPOCH = datetime.datetime(1899, 12, 30)   # 시트 날짜 일련번호 기준일
+META_FIELDS  = "sheets(properties(sheetId,title),conditionalFormats"
+SERIAL_PARAMS = {"valueRenderOption": "UNFORMATTED_VALUE", "dateTimeRenderOption": "SERIAL_NUMBER"}
+VALUE_PARAMS = {"valueInputOption": "USER_ENTERED"}
+
+GREEN = {"red": 0, "green": 1, "blue": 0}
+RED   = {"red": 1, "green": 0, "blue": 0}
+
+
+def with_backoff(fn, *args, retry_status=RETRY_STATUS, **kwargs):
+    """APIError retry_status(기본 429/5xx) 시 1, 2, 4, 8 … 초(+지터) 대기 후 재시도"""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            with METRICS.stage(f"sheets.{fn.__name__}"):
+                return fn(*args, **kwargs)
+        except APIError as e:
+            status = getattr(e.response, "status_code", None)
+            if status not in retry_status or attempt == MAX_RETRIES:
+                raise
+            METRICS.count("sheets_retries")
+            delay = 2 ** attempt + random.random()
+            logging.warning(f"⚠️ Sheets API {status} — {delay:.1f}초 후 재시도 ({attempt + 1}/{MAX_RETRIES})")
+            time.sleep(delay)
+
+
+def _values(rows) -> list:
+    """행 목록 → JSON 직렬화 가능한 값 (None → 빈 칸, numpy 스칼라 → Python 값)"""
+    return [["" if v is None else v.item() if hasattr(v, "item") else v for v in r] for r in rows]
+
+
+def _date_key(v) -> str:
+    """History date 셀(일련번호 또는 문자열) → "YYYY-MM-DD HH:MM:SS" """
+    if isinstance(v, (int, float)):
+        dt = SERIAL_EPOCH + datetime.timedelta(days=v)
+        return (dt + datetime.timedelta(microseconds=500_000)).strftime("%Y-%m-%d %H:%M:%S")
+    return str(v)
+
+
+def _delta_rule(sheet_id: int, prefix: str, color: dict) -> dict:
+    return {"addConditionalFormatRule": {"index": 0, "rule": {
+        "ranges": [{"sheetId": sheet_id, "startRowIndex": 1,
+                    "startColumnIndex": DELTA_COLS[0], "endColumnIndex": DELTA_COLS[1]}],
+        "booleanRule": {
+            "condition": {"type": "TEXT_STARTS_WITH", "values": [{"userEnteredValue": prefix}]},
+            "format": {"textFormat": {"bold": True, "foregroundColor": color}},
+        },
+    }}}
+
+
+class SheetSink:
+    """History 추가 + Today 교체 (구조 batchUpdate 1회 + USER_ENTERED 값 기록)"""
+
+    def __init__(self, spreadsheet, history_sheet: str = HIST_SHEET, today_sheet: str = TODAY_SHEET):
+        self.sh = spreadsheet
+        self.hist_sheet, self.today_sheet = history_sheet, today_sheet
+        try:
+            # 두 탭의 A1 만 함께 받아 History 헤더 유무까지 한 번에 확인
+            meta = with_backoff(self.sh.fetch_sheet_metadata, params={
+                "ranges": [f"'{t}'!A1:A1" for t in (history_sheet, today_sheet)],
+                "includeGridData": "true",
+                "fields": META_FIELDS + ",data(rowData(values(formattedValue))))",
+            })
+        except APIError as e:
+            if getattr(e.response, "status_code", None) != 400:
+                raise
+            # 탭이 아직 없으면 범위를 해석할 수 없음 → 전체 탭 목록만 (헤더 유무는 기록 시 확인)
+            meta = with_backoff(self.sh.fetch_sheet_metadata, params={"fields": META_FIELDS + ")"})
+        self.sheets = {
+            s["properties"]["title"]: {
+                "id": s["properties"]["sheetId"],
+                "has_rules": bool(s.get("conditionalFormats")),
+                "has_header": (any(v.get("formattedValue") for d in s["data"]
+                                   for r in d.get("rowData", []) for v in r.get("values", []))
+                               if "data" in s else None),
+            }
+            for s in meta.get("sheets", [])
+        }
+
+    def history_records(self) -> list:
+        """History 전체 → dict 목록 (로컬 이력 저장소 초기화용)"""
+        if self.hist_sheet not in self.sheets:
+            return []
+        values = with_backoff(self.sh.values_get, self.hist_sheet).get("values", [])
+        if len(values) < 2:
+            return []
+        header = values[0]
+        records = [dict(zip(header, row)) for row in values[1:]]
+        if "date" in header:
+            # 표시 형식(로캘)에 따른 날짜 문자열 대신 일련번호로 다시 받아 "YYYY-MM-DD HH:MM:SS" 로 통일
+            col = chr(ord("A") + header.index("date"))
+            dates = with_backoff(self.sh.values_get, f"'{self.hist_sheet}'!{col}2:{col}",
+                                 params=SERIAL_PARAMS).get("values", [])
+            for rec, d in zip(records, dates):
+                if d and d[0] != "":
+                    rec["date"] = _date_key(d[0])
+        return records
+
+    def history_keys(self) -> set:
+        """History 에 이미 있는 (asin, date) — 재시도 시 중복 추가 방지용"""
+        if self.hist_sheet not in self.sheets:
+            return set()
+        # 날짜 셀은 시트 로캘 표시 형식과 무관하게 일련번호로 받아 실행 시각 문자열로 맞춤
+        values = with_backoff(self.sh.values_get, f"'{self.hist_sheet}'!A2:F",
+                              params=SERIAL_PARAMS).get("values", [])
+        return {(str(r[0]), _date_key(r[5])) for r in values if len(r) >= 6}
+
+    def _ensure_sheet(self, title: str, rows: int, requests: list) -> int:
+        if title in self.sheets:
+            return self.sheets[title]["id"]
+        # 여러 작업이 같은 스프레드시트에 탭을 추가해도 겹치지 않도록 무작위 ID
+        taken = {s["id"] for s in self.sheets.values()}
+        sheet_id = next(i for i in iter(lambda: random.randrange(1, 2**31 - 1), None) if i not in taken)
+        requests.append({"addSheet": {"properties": {
+            "sheetId": sheet_id, "title": title,
+            "gridProperties": {"rowCount": rows, "columnCount": 20},
+        }}})
+        self.sheets[title] = {"id": sheet_id, "has_rules": False, "has_header": False, "new": True}
+        return sheet_id
+
+    def write(self, header: list, rows: list, history_rows: list = None) -> dict:
+        """History 에 history_rows(기본 rows) 추가, Today 를 header + rows 로 교체"""
+        history_rows = rows if history_rows is None else history_rows
+        requests = []
+        self._ensure_sheet(self.hist_sheet, 2000, requests)
+        today_id = self._ensure_sheet(self.today_sheet, 100, requests)
+
+        hist = self.sheets[self.hist_sheet]
+        if hist["has_header"] is None:
+            hist["has_header"] = bool(with_backoff(
+                self.sh.values_get, f"'{self.hist_sheet}'!A1:A1").get("values"))
+        append_rows = ([] if hist["has_header"] else [header]) + history_rows
+
+        # Today 값 전체 삭제 (서식·조건부 서식은 유지)
+        requests.append({"updateCells": {"range": {"sheetId": today_id}, "fields": "userEnteredValue"}})
+        if not self.sheets[self.today_sheet]["has_rules"]:
+            # 예전 셀 단위 서식 제거 후 조건부 서식 규칙으로 대체
+            requests += [
+                {"repeatCell": {
+                    "range": {"sheetId": today_id, "startRowIndex": 1,
+                              "startColumnIndex": DELTA_COLS[0], "endColumnIndex": DELTA_COLS[1]},
+                    "cell": {"userEnteredFormat": {}},
+                    "fields": "userEnteredFormat.textFormat",
+                }},
+                _delta_rule(today_id, "▴", GREEN),
+                _delta_rule(today_id, "▾", RED),
+            ]
+            self.sheets[self.today_sheet]["has_rules"] = True
+
+        resp = with_backoff(self.sh.batch_update, {"requests": requests})
+        for s in self.sheets.values():
+            s.pop("new", None)
+
+        with_backoff(self.sh.values_batch_update, {
+            **VALUE_PARAMS,
+            "data": [{"range": f"'{self.today_sheet}'!A1", "values": _values([header] + rows)}],
+        })
+        if append_rows:
+            with_backoff(self.sh.values_append, f"'{self.hist_sheet}'!A1",
+                         {**VALUE_PARAMS, "insertDataOption": "INSERT_ROWS"},
+                         {"values": _values(append_rows)}, retry_status=APPEND_RETRY_STATUS)
+            hist["has_header"] = True
+        logging.info(f"📝 Sheets 기록: 구조 요청 {len(requests)}건, {self.hist_sheet} +{len(history_rows)}행")
+        return resp
+
+
+class FakeSpreadsheet:
+    """드라이런용 가짜 Spreadsheet — 요청 본문을 DRY_RUN_PATH 에 JSON 으로 기록"""
+
+    def __init__(self, path: str = DRY_RUN_PATH, sheets=(HIST_SHEET, TODAY_SHEET)):
+        self.path = path
+        self.titles = list(sheets)
+        self.calls = []
+
+    def fetch_sheet_metadata(self, params=None):
+        self.calls.append({"fetch_sheet_metadata": params})
+        grid = {"data": [{}]} if params and params.get("includeGridData") else {}
+        return {"sheets": [{"properties": {"sheetId": i, "title": t}, **grid}
+                           for i, t in enumerate(self.titles)]}
+
+    def values_get(self, range_name, params=None):
+        self.calls.append({"values_get": range_name})
+        return {"values": []}
+
+    def _record(self, call: dict):
+        self.calls.append(call)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.calls, f, ensure_ascii=False, indent=1)
+
+    def batch_update(self, body):
+        self._record({"batch_update": body})
+        logging.info(f"🧪 드라이런: Sheets 요청 {len(body['requests'])}건 → {self.path}")
+        return {"replies": [{} for _ in body["requests"]]}
+
+    def values_batch_update(self, body):
+        self._record({"values_batch_update": body})
+        return {"responses": [{} for _ in body["data"]]}
+
+    def values_append(self, range_name, params, body):
+        self._record({"values_append": {"range": range_name, "params": params, "body": body}})
+        return {"updates": {"updatedRows": len(body["values"])}}
@@ -0,0 +1,125 @@
+# snapshot_archive.py
+"""
+원본 페이지 HTML · 전체 카드 순위 압축 보관소 (내용 주소 기반)
+- 객체는 sha256(원문) 이름으로 objects/ab/abcdef… 에 한 번만 저장 → 같은 순위는 중복 저장 안 함
+- 원본 HTML 은 요청마다 토큰이 달라 해시가 매번 바뀌므로, 카드 목록(순위·가격·제목)이
+  이미 보관된 것과 같으면 HTML 을 새로 저장하지 않고 그때의 HTML 해시를 재사용
+- 압축은 zstandard 가 설치돼 있으면 zstd, 없으면 gzip
+- index.jsonl 에 (시각, 작업, 페이지, HTML 해시, 카드 해시) 한 줄씩 추가
+- iter_snapshots() 는 인덱스를 한 줄씩 읽으며 기간 조건에 맞는 스냅샷만 지연 로드
+"""
+
+import os, json, gzip, hashlib, threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", "archive")
+_EXT = ".zst" if zstandard else ".gz"
+
+
+def _compress(data: bytes) -> bytes:
+    if zstandard:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=9)
+
+
+def _decompress(path: str) -> bytes:
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".zst"):
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotArchive:
+    def __init__(self, root: str = ARCHIVE_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, "index.jsonl")
+        self._lock = threading.Lock()
+        self._html_for = None       # 카드 해시 → 처음 보관한 HTML 해시 (인덱스에서 지연 로드)
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+    def _object_path(self, digest: str, ext: str = _EXT) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest + ext)
+
+    def _find(self, digest: str):
+        for ext in (".zst", ".gz"):
+            path = self._object_path(digest, ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, data: bytes) -> str:
+        """원문 저장 → sha256 해시 (이미 있으면 쓰지 않음)"""
+        digest = hashlib.sha256(data).hexdigest()
+        if self._find(digest):
+            return digest
+        path = self._object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_compress(data))
+        os.replace(tmp, path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        path = self._find(digest)
+        if path is None:
+            raise KeyError(digest)
+        return _decompress(path)
+
+    def _html_index(self) -> dict:
+        if self._html_for is None:
+            self._html_for = {}
+            for e in self.iter_index():
+                self._html_for.setdefault(e["cards"], e["html"])
+        return self._html_for
+
+    def add(self, taken_at: str, job: str, page: int, html: str, cards: list) -> dict:
+        """페이지 HTML + 전체 카드 순위 보관, 인덱스 한 줄 추가 → 인덱스 항목 (카드가 같으면 HTML 재사용)"""
+        cards_digest = self.put(json.dumps(cards, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        with self._lock:
+            html_digest = self._html_index().get(cards_digest)
+        if html_digest is None or not self._find(html_digest):
+            html_digest = self.put(html.encode("utf-8"))
+        entry = {
+            "taken_at": taken_at,
+            "job": job,
+            "page": page,
+            "html": html_digest,
+            "cards": cards_digest,
+            "n_cards": len(cards),
+        }
+        with self._lock, open(self.index_path, "a", encoding="utf-8") as f:
+            self._html_for.setdefault(cards_digest, html_digest)
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    def iter_index(self, start: str = None, end: str = None, job: str = None):
+        """인덱스 항목을 한 줄씩 yield (taken_at 문자열 비교, start 이상 · end 이하)"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if start and entry["taken_at"] < start:
+                    continue
+                if end and entry["taken_at"] > end:
+                    continue
+                if job and entry["job"] != job:
+                    continue
+                yield entry
+
+    def iter_snapshots(self, start: str = None, end: str = None, job: str = None, with_html: bool = False):
+        """(인덱스 항목, 카드 목록[, HTML]) 을 기간 순서대로 지연 로드"""
+        for entry in self.iter_index(start, end, job):
+            cards = json.loads(self.get(entry["cards"]))
+            if with_html:
+                yield entry, cards, self.get(entry["html"]).decode("utf-8")
+            else:
+                yield entry, cards
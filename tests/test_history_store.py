@@ -0,0 +1,56 @@
+import pandas as pd
+
+from history_store import HistoryStore, EXIT_MARK
+from pricing import rank_delta
+
+D1, D2, D3 = "2025-01-01 06:00:00", "2025-01-02 06:00:00", "2025-01-03 06:00:00"
+
+
+def row(asin, rank, price, date):
+    return {"asin": asin, "title": asin, "rank": rank, "price": price, "url": "",
+            "date": date, "rank_delta": "-", "price_delta": "-"}
+
+
+def test_changed_and_exit_rows_together():
+    """변경 행 + 이탈 행을 한 번에 append 해도 이탈은 present=0, 직전 순위·가격 유지"""
+    store = HistoryStore(":memory:")
+    store.append(pd.DataFrame([row("A", 1, "100,00 €", D1), row("B", 2, "200,00 €", D1)]),
+                 run_date=D1, keyframe=True)
+
+    # 2일차: C 신규, B 이탈
+    exits = store.exits(["A", "C"], D2)
+    assert exits["asin"].tolist() == ["B"]
+    assert exits["price_delta"].tolist() == [EXIT_MARK]
+    store.append(pd.concat([pd.DataFrame([row("C", 2, "50,00 €", D2)]), exits], ignore_index=True),
+                 run_date=D2)
+
+    latest = store.latest().set_index("asin")
+    assert latest.loc["B", "present"] == 0
+    assert latest.loc["B", "rank"] == 2
+    assert latest.loc["B", "price"] == "200,00 €"
+    assert latest.loc["C", "present"] == 1
+
+    # 3일차: 이탈한 B 를 다시 이탈 행으로 내보내지 않음
+    assert store.exits(["A", "C"], D3).empty
+
+    # B 재진입(3위) → 직전 2위 대비 ▾1
+    prev = store.latest(["B"])["rank"]
+    assert rank_delta(prev, pd.Series([3])).tolist() == ["▾1"]
+
+    hist = store.history("B")
+    assert hist["rank"].isna().tolist() == [False, True]
+
+
+def test_rebuild_from_sheet_rows_keeps_exits():
+    """시트 History(변경분 + 이탈 행)만으로 초기화해도 이탈 이후 목록에서 빠짐"""
+    exit_row = {**row("B", None, "", D2), "title": "", "rank_delta": "", "price_delta": EXIT_MARK}
+    sheet = pd.DataFrame([row("A", 1, "100,00 €", D1), row("B", 2, "200,00 €", D1),
+                          row("A", 2, "90,00 €", D3), exit_row])
+    store = HistoryStore(":memory:")
+    store.append(sheet)
+
+    series = store.daily_series()
+    assert series.groupby("run_date")["asin"].apply(list).to_dict() == {
+        D1: ["A", "B"], D2: ["A"], D3: ["A"],
+    }
+    assert store.latest().set_index("asin").loc["B", "present"] == 0
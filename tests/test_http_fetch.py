@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_fetch import HttpFetcher
+from page_parser import parse_cards
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "bestseller_de.html")
+EMPTY = b"<html><body><div id='gridItemRoot'></div></body></html>"
+
+
+class Handler(BaseHTTPRequestHandler):
+    hits = {}
+    cookies = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for k, v in headers:
+            self.send_header(k, v)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        n = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        self.cookies.append(self.headers.get("Cookie", ""))
+        if self.path == "/busy" and n == 1:
+            self._send(429, headers=[("Retry-After", "1")])
+        elif self.path == "/down":
+            self._send(503)
+        elif self.path == "/empty":
+            self._send(200, EMPTY)
+        else:
+            with open(FIXTURE, "rb") as f:
+                self._send(200, f.read())
+
+
+@pytest.fixture
+def server():
+    Handler.hits, Handler.cookies = {}, []
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_sends_session_and_locale_cookies(server):
+    with HttpFetcher(cookies=[{"name": "session-id", "value": "123-456"}],
+                     locale_cookies={"lc-main": "en_GB", "i18n-prefs": "GBP"}) as fetcher:
+        html = fetcher.fetch(f"{server}/zgbs")
+    sent = dict(c.split("=", 1) for c in Handler.cookies[0].split("; "))
+    assert sent == {"session-id": "123-456", "lc-main": "en_GB", "i18n-prefs": "GBP"}
+    assert len(parse_cards(html)) == 3
+
+
+def test_retries_429_after_retry_after(server):
+    with HttpFetcher(backoff=0) as fetcher:
+        started = time.monotonic()
+        html = fetcher.fetch(f"{server}/busy")
+    assert Handler.hits["/busy"] == 2
+    assert time.monotonic() - started >= 1
+    assert parse_cards(html)
+
+
+def test_gives_up_after_retries(server):
+    """재시도 소진 → requests 예외 (crawl.fetch_page_http 가 Selenium 으로 대체)"""
+    with HttpFetcher(retries=2, backoff=0) as fetcher, pytest.raises(requests.RequestException):
+        fetcher.fetch(f"{server}/down")
+    assert Handler.hits["/down"] == 3
+
+
+def test_page_without_cards_needs_fallback(server):
+    """정적 HTML 에 카드가 없으면 파싱 결과 0개 → HTTP_MIN_CARDS 미만으로 Selenium 대체"""
+    with HttpFetcher() as fetcher:
+        html = fetcher.fetch(f"{server}/empty")
+    assert parse_cards(html) == []
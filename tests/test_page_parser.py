@@ -0,0 +1,43 @@
+import os
+
+from page_parser import parse_cards, to_records
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "bestseller_de.html")
+
+
+def load_bytes():
+    with open(FIXTURE, "rb") as f:
+        return f.read()
+
+
+def test_path_bytes_and_str_parse_identically():
+    """<meta charset> 없는 저장 페이지: 경로 · bytes · str 입력 결과가 같아야 함"""
+    raw = load_bytes()
+    by_path = parse_cards(FIXTURE)
+    assert parse_cards(raw) == by_path
+    assert parse_cards(raw.decode("utf-8")) == by_path
+
+
+def test_fixture_cards():
+    cards = parse_cards(FIXTURE)
+    assert [c["rank"] for c in cards] == [1, 2, 3]
+    assert [c["asin"] for c in cards] == ["B0BPKZ3R8G", "B094FWWKQ1", "B0B5RQL6LB"]
+
+    lg = cards[0]
+    assert lg["price_text"] == "1.299,00\u00a0€"     # UTF-8 로 읽어야 '€' 인식
+    assert "Höhenverstellbar" in lg["title"]          # UTF-8 제목 유지
+    assert lg["url"] == "https://www.amazon.de/LG-UltraGear-27GR95QE-B-Gaming-Monitor/dp/B0BPKZ3R8G/ref=zg_bs_g_429868031_d_sccl_1"
+    assert lg["brand"] == "LG"
+
+    assert cards[1]["brand"] == ""
+    assert cards[2]["title"].startswith("LG 24MP400-B")   # 제목 div 없으면 img alt
+    assert cards[2]["price_text"] == ""
+
+
+def test_to_records_filters_brand():
+    records = to_records(parse_cards(FIXTURE, brands=("LG",)))
+    assert [r["asin"] for r in records] == ["B0BPKZ3R8G", "B0B5RQL6LB"]
+    assert set(records[0]) == {"asin", "title", "url", "price", "rank"}
+
+    samsung = to_records(parse_cards(FIXTURE, brands=("samsung",)))
+    assert [r["asin"] for r in samsung] == ["B094FWWKQ1"]
@@ -0,0 +1,32 @@
+import math
+
+import pandas as pd
+
+from pricing import parse_prices, price_cents, price_to_float, price_delta, rank_delta
+
+
+def test_listed_formats():
+    prices = ["1.299,00 €", "€1,299.00", "299,99 €", "1.299 €", "£249.50", "89,9 €",
+              "1 299,00 €", "1 299,00 €"]
+    assert parse_prices(prices).tolist() == [1299.0, 1299.0, 299.99, 1299.0, 249.5, 89.9, 1299.0, 1299.0]
+
+
+def test_range_uses_first_price():
+    assert price_to_float("199,99 € - 249,99 €") == 199.99
+    assert price_to_float("€199.99 – €249.99") == 199.99
+
+
+def test_empty_and_unparseable():
+    out = parse_prices(["", None, "Derzeit nicht verfügbar", "€"])
+    assert all(math.isnan(v) for v in out)
+    assert price_cents(["", None]).isna().all()
+
+
+def test_cents_are_exact():
+    assert price_cents(["0,10 €", "0,20 €", "0,30 €"]).tolist() == [10, 20, 30]
+
+
+def test_deltas():
+    assert price_delta(pd.Series(["199,99 €", "", "100,00 €"]),
+                       pd.Series(["189,99 €", "50,00 €", "100,00 €"])).tolist() == ["▾10.00", "-", "-"]
+    assert rank_delta(pd.Series([5, None, 2]), pd.Series([3, 1, 4])).tolist() == ["▴2", "-", "▾2"]
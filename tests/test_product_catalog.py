@@ -0,0 +1,49 @@
+import pytest
+
+from page_parser import match_brand
+from product_catalog import ProductCatalog, extract
+
+LG = "LG UltraGear 27GR95QE-B 27 Zoll OLED Gaming Monitor, 240Hz, 2560x1440"
+ALIENWARE = "Dell Alienware AW3423DWF 34 Zoll QD-OLED Curved Gaming Monitor, 165Hz, 3440x1440"
+MACBOOK = "Kompatibel mit Apple MacBook: LG UltraFine 5K 27MD5KL-B 68,6 cm (27 Zoll) IPS Monitor"
+SAMSUNG = "Samsung Odyssey G5 S27CG552EU 68,58 cm Curved VA Gaming Monitor 165 Hz WQHD"
+TITAN = "Titan Army P2510S 24,5 Zoll Fast IPS 240Hz Full HD"
+
+
+def test_extract_model_variant_size():
+    info = extract("B0BPKZ3R8G", LG)
+    assert (info["brand"], info["model"], info["variant"]) == ("LG", "27GR95QE", "B")
+    assert (info["size_in"], info["resolution"], info["refresh_hz"], info["panel"]) == (27.0, "QHD", 240, "OLED")
+
+
+def test_extract_size_from_cm_and_unknown_brand():
+    samsung = extract("S", SAMSUNG)
+    assert (samsung["brand"], samsung["model"], samsung["size_in"]) == ("Samsung", "S27CG552EU", 27.0)
+    assert (samsung["resolution"], samsung["panel"]) == ("QHD", "VA")
+
+    titan = extract("T", TITAN)
+    assert (titan["brand"], titan["brands"], titan["model"]) == ("Titan", "", "P2510S")
+    assert (titan["size_in"], titan["resolution"]) == (24.5, "FHD")
+
+
+def test_extract_all_known_brands_in_title_order():
+    assert extract("A", ALIENWARE)["brands"] == "Dell,Alienware"
+    info = extract("M", MACBOOK)
+    assert (info["brand"], info["brands"], info["model"], info["variant"]) == ("Apple", "Apple,LG", "27MD5KL", "B")
+
+
+@pytest.mark.parametrize("brands", [("LG",), ("Alienware",), ("Dell",), ("lg", "Samsung"), ("Apple",),
+                                    ("Titan",), ("Samsung", "Titan")])
+def test_match_same_as_title_regex(tmp_path, brands):
+    """카탈로그 조회로 판정해도 제목 정규식(match_brand)과 같은 제품을 남김"""
+    with ProductCatalog(str(tmp_path / "catalog.db")) as catalog:
+        for i, title in enumerate([LG, ALIENWARE, MACBOOK, SAMSUNG, TITAN]):
+            assert catalog.match(f"ASIN{i}", title, brands) == match_brand(title, brands)
+            assert catalog.match(f"ASIN{i}", title, brands) == match_brand(title, brands)   # 캐시 조회
+
+
+def test_match_secondary_brand(tmp_path):
+    with ProductCatalog(str(tmp_path / "catalog.db")) as catalog:
+        assert catalog.match("A", ALIENWARE, ("Alienware",)) == "Alienware"
+        assert catalog.match("M", MACBOOK, ("LG",)) == "LG"
+        assert catalog.match("S", SAMSUNG, ("LG",)) == ""
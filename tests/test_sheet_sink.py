@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+import requests
+from gspread.exceptions import APIError
+
+import sheet_sink
+from sheet_sink import SheetSink, FakeSpreadsheet, _date_key
+
+HEADER = ["asin", "title", "rank", "price", "url", "date", "rank_delta", "price_delta"]
+ROW = ["B0BPKZ3R8G", "LG 27GR95QE", np.int64(1), "1.299,00 €", "", "2025-01-02 06:00:00", "▴1", "-"]
+
+
+def test_values_written_user_entered(tmp_path):
+    sh = FakeSpreadsheet(path=str(tmp_path / "dry.json"))
+    SheetSink(sh).write(HEADER, [ROW])
+    calls = {k: v for c in sh.calls for k, v in c.items()}
+
+    # 구조 요청에는 값이 없고, 값은 USER_ENTERED 로만 기록 (날짜·가격이 셀 값으로 해석)
+    assert all("appendCells" not in r for r in calls["batch_update"]["requests"])
+    today = calls["values_batch_update"]
+    assert today["valueInputOption"] == "USER_ENTERED"
+    assert today["data"][0]["values"] == [HEADER, ROW[:2] + [1] + ROW[3:]]
+    assert type(today["data"][0]["values"][1][2]) is int
+
+    hist = calls["values_append"]
+    assert hist["params"]["valueInputOption"] == "USER_ENTERED"
+    assert hist["body"]["values"] == [HEADER, ROW[:2] + [1] + ROW[3:]]   # 빈 History → 헤더 포함
+
+
+def test_header_checked_from_metadata(tmp_path):
+    """History A1 은 메타데이터 조회에서 함께 받음 → 별도 values_get 없음, 헤더 있으면 다시 안 씀"""
+    class WithHeader(FakeSpreadsheet):
+        def fetch_sheet_metadata(self, params=None):
+            meta = super().fetch_sheet_metadata(params)
+            meta["sheets"][0]["data"] = [{"rowData": [{"values": [{"formattedValue": "asin"}]}]}]
+            return meta
+
+    sh = WithHeader(path=str(tmp_path / "dry.json"))
+    SheetSink(sh).write(HEADER, [ROW])
+    assert not any("values_get" in c for c in sh.calls)
+    hist = next(c["values_append"] for c in sh.calls if "values_append" in c)
+    assert hist["body"]["values"] == [ROW[:2] + [1] + ROW[3:]]
+
+
+def test_history_records_dates_normalized(tmp_path):
+    """로컬 저장소 초기화용 History 읽기: 표시 형식과 무관하게 날짜는 ISO 문자열"""
+    class LocalizedHistory(FakeSpreadsheet):
+        def values_get(self, range_name, params=None):
+            super().values_get(range_name, params)
+            if params:
+                return {"values": [[45659.25], [], [45660.25]]}
+            return {"values": [HEADER,
+                               ["B0BPKZ3R8G", "LG", "1", "1.299,00 €", "", "02.01.2025 06:00:00"],
+                               [],
+                               ["B094FWWKQ1", "LG", "2", "299,00 €", "", "03.01.2025 06:00:00"]]}
+
+    records = SheetSink(LocalizedHistory(path=str(tmp_path / "dry.json"))).history_records()
+    assert [r.get("date") for r in records] == ["2025-01-02 06:00:00", None, "2025-01-03 06:00:00"]
+    assert records[0]["price"] == "1.299,00 €"
+
+
+def test_date_key_serial_and_text():
+    assert _date_key(45659.25) == "2025-01-02 06:00:00"
+    assert _date_key(45659.25 + 0.4 / 86400) == "2025-01-02 06:00:00"
+    assert _date_key("2025-01-02 06:00:00") == "2025-01-02 06:00:00"
+
+
+def api_error(status):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = b'{"error": {"code": %d, "message": "x"}}' % status
+    return APIError(resp)
+
+
+class FlakyAppend(FakeSpreadsheet):
+    def __init__(self, statuses, **kw):
+        super().__init__(**kw)
+        self.statuses = list(statuses)
+
+    def values_append(self, range_name, params, body):
+        if self.statuses:
+            self._record({"values_append_failed": self.statuses[0]})
+            raise api_error(self.statuses.pop(0))
+        return super().values_append(range_name, params, body)
+
+
+def test_history_append_not_retried_on_5xx(tmp_path, monkeypatch):
+    """5xx 는 서버가 이미 추가했을 수 있어 재시도하지 않음 (중복 행 방지)"""
+    monkeypatch.setattr(sheet_sink.time, "sleep", lambda s: None)
+    sh = FlakyAppend([503], path=str(tmp_path / "dry.json"))
+    with pytest.raises(APIError):
+        SheetSink(sh).write(HEADER, [ROW])
+    assert sum("values_append_failed" in c for c in sh.calls) == 1
+
+
+def test_history_append_retried_on_429(tmp_path, monkeypatch):
+    monkeypatch.setattr(sheet_sink.time, "sleep", lambda s: None)
+    sh = FlakyAppend([429, 429], path=str(tmp_path / "dry.json"))
+    SheetSink(sh).write(HEADER, [ROW])
+    assert sum("values_append" in c for c in sh.calls) == 1
@@ -0,0 +1,33 @@
+import os
+
+from snapshot_archive import SnapshotArchive
+
+CARDS = [{"rank": 1, "asin": "B0BPKZ3R8G", "title": "LG 27GR95QE", "price_text": "1.299,00 €"}]
+
+
+def n_objects(root):
+    return sum(len(files) for _, _, files in os.walk(os.path.join(root, "objects")))
+
+
+def test_unchanged_cards_reuse_html(tmp_path):
+    """요청 토큰만 다른 HTML 은 카드가 같으면 다시 저장하지 않음"""
+    archive = SnapshotArchive(str(tmp_path))
+    first = archive.add("2025-01-01 06:00:00", "de", 1, "<html>token=aaa</html>", CARDS)
+    before = n_objects(tmp_path)
+    second = archive.add("2025-01-02 06:00:00", "de", 1, "<html>token=bbb</html>", CARDS)
+    assert n_objects(tmp_path) == before
+    assert second["html"] == first["html"]
+    assert archive.get(second["html"]) == b"<html>token=aaa</html>"
+
+    # 다시 연 보관소도 인덱스로 재사용 판단
+    reopened = SnapshotArchive(str(tmp_path))
+    assert reopened.add("2025-01-03 06:00:00", "de", 1, "<html>token=ccc</html>", CARDS)["html"] == first["html"]
+
+
+def test_changed_cards_store_new_html(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+    first = archive.add("2025-01-01 06:00:00", "de", 1, "<html>a</html>", CARDS)
+    moved = [{**CARDS[0], "price_text": "1.199,00 €"}]
+    second = archive.add("2025-01-02 06:00:00", "de", 1, "<html>b</html>", moved)
+    assert second["html"] != first["html"] and second["cards"] != first["cards"]
+    assert [c for _, c in archive.iter_snapshots()] == [CARDS, moved]